@@ -8,19 +8,18 @@ import sys, os
 # os.chdir(os.path.realpath(os.path.dirname(__file__)))
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
-from cachetools import LRUCache, cached, TTLCache
 import dash
+import flask
 import dash_table
 import dash_core_components as dcc
 import dash_html_components as html
-from dash.dependencies import Input, Output, State
-from stockstats import StockDataFrame as Sdf
+from dash.dependencies import Input, Output, State, ClientsideFunction
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import dash_table as dt
 import yahoo_fin.stock_info as yf
 import yfinance
 from datetime import datetime, timedelta
-import plotly.graph_objs as go
 import pickle
 import numpy as np
 import pandas as pd
@@ -28,6 +27,13 @@ import random
 import numpy
 from dotenv import load_dotenv
 from src.stock_info import getStockTable
+from src.market_data import (
+    FIRST_PAINT_PERIOD, FULL_PERIOD, get_market_bundle, fetch_history, first_paint_history, cache_stats
+)
+from src.indicators import result_stats
+from src.figures import CHART_LAYOUTS, chart_data, buzz_figure
+from src.downsample import x_range
+from src import warmup, compression, mentions
 
 load_dotenv()
 
@@ -41,11 +47,6 @@ TWITTER_LOGO = "https://assets.stickpng.com/images/580b57fcd9996e24bc43c53e.png"
 with open("tickers.pickle", "rb") as f:
     ticker_list = pickle.load(f)
 
-colors = {
-    "background": "#FFFFFF",
-    "text": "#000000"
-}
-
 
 #---------------------------PAGE LAYOUT AND CONTENTS---------------------------#
 """
@@ -141,7 +142,20 @@ LEFT_COLUMN = dbc.Jumbotron(
 )
 
 TICKER_DASHBOARD = [
-    dbc.CardHeader(html.H5("Live Dashboard")),
+    dbc.CardHeader(
+        [
+            html.H5("Live Dashboard", style={"display": "inline-block", "marginBottom": 0}),
+            dbc.Badge(
+                "Updating...",
+                id="stock-data-updating",
+                color="warning",
+                className="ml-2",
+                style={"display": "none"},
+            ),
+            # RE-RUNS THE CHART CALLBACK WHILE STALE DATA IS BEING REFRESHED IN THE BACKGROUND
+            dcc.Interval(id="stock-refresh-interval", interval=5 * 1000, disabled=True),
+        ]
+    ),
     dbc.CardBody(
         [
             dcc.Loading(
@@ -204,6 +218,15 @@ TICKER_DASHBOARD = [
                         ],
                         no_gutters=True,
                     ),
+                    # DROPDOWN VALUE AT THE LAST "Chart" CLICK, REFRESHES AND ZOOMS STAY ON THAT TICKER
+                    dcc.Store(id="submitted-ticker"),
+                    # PIXEL WIDTH OF THE CHART, THE SERVER SENDS ABOUT ONE POINT PER PIXEL
+                    dcc.Store(id="chart-width"),
+                    # BARS AND INDICATORS FOR THE TICKER, THE FIGURE IS BUILT FROM THEM IN THE BROWSER
+                    dcc.Store(id="chart-data"),
+                    # PERIOD OF THE HISTORY IN chart-data, THE LAST YEAR UNTIL THE USER LOOKS FURTHER BACK
+                    dcc.Store(id="chart-period"),
+                    dcc.Store(id="chart-layouts", data=CHART_LAYOUTS),
                     dbc.Row(
                         [
                             dcc.Graph(
@@ -219,6 +242,38 @@ TICKER_DASHBOARD = [
                 ],
                 type="default",
             ),
+            # MENTION VOLUME, READ FROM THE ROLLUP TABLES ONLY (src/mentions.py)
+            dbc.Row(
+                [
+                    dbc.Col(html.P("Reddit buzz:"), width=3),
+                    dbc.Col(
+                        dbc.RadioItems(
+                            id="buzz-granularity",
+                            options=[
+                                {"label": "Last day (per minute)", "value": "minute"},
+                                {"label": "Last week (per hour)", "value": "hour"},
+                                {"label": "Last year (per day)", "value": "day"},
+                            ],
+                            value="hour",
+                            inline=True,
+                        ),
+                        width=9,
+                    ),
+                ],
+                no_gutters=True,
+                style={"marginTop": 10},
+            ),
+            dcc.Interval(id="buzz-refresh-interval", interval=60 * 1000),
+            dcc.Loading(
+                id="loading-buzz-chart",
+                children=[
+                    dcc.Graph(
+                        id="buzz-chart",
+                        config={"displaylogo": False, "displayModeBar": False},
+                    ),
+                ],
+                type="default",
+            ),
         ],
         style={"marginTop": 0, "marginBottom": 0},
     ),
@@ -234,6 +289,15 @@ REDDIT_COMMENTS_CONTAINER = [
     ),
     dbc.CardBody(
         [
+            # FREE-TEXT SEARCH OVER ALL COMMENTS, THE FEED SHOWS THE TICKER'S MENTIONS WHILE IT IS EMPTY
+            dbc.Input(
+                id="reddit-search",
+                type="search",
+                placeholder="Search comments...",
+                debounce=True,
+                bsSize="sm",
+                style={"marginBottom": 10},
+            ),
             dcc.Loading(
                 id="loading-reddit-comments", 
                 children=[
@@ -243,6 +307,10 @@ REDDIT_COMMENTS_CONTAINER = [
                         color="warning",
                         style={"display": "none"},
                     ),
+                    # NEWEST PAGE OF CARDS, APPENDED TO THE FEED IN THE BROWSER (assets/feed.js)
+                    dcc.Store(id="reddit-page"),
+                    # [TICKER, SEARCH, date_time, id] OF THE OLDEST CARD SHOWN, THE NEXT PAGE STARTS AFTER IT
+                    dcc.Store(id="reddit-cursor"),
                     dbc.Row(
                         [
                             dbc.Col(
@@ -257,6 +325,13 @@ REDDIT_COMMENTS_CONTAINER = [
                 ],
                 type="default"
             ),
+            dbc.Button(
+                "Load more",
+                id="reddit-load-more",
+                color="secondary",
+                size="sm",
+                style={"display": "none"},
+            ),
             html.Hr(),
         ],
         style={"minHeight": 446}
@@ -322,6 +397,7 @@ FOOTER = html.Footer(
 
 app = dash.Dash(
     __name__, 
+    compress=False, # src/compression.py DOES IT, WITH BROTLI AND CACHED STATIC BODIES
     external_stylesheets=[
         dbc.themes.BOOTSTRAP, 
         'https://use.fontawesome.com/releases/v5.8.1/css/all.css'
@@ -347,6 +423,33 @@ app.title = "Ticker Buzz"
 app.layout = html.Div(children=[NAVBAR, BODY, FOOTER])
 
 #-----------------------------CALLBACK FETCH STOCK-----------------------------#
+"""
+The price header, the stats table and the chart are separate callbacks so Dash
+requests them in parallel and paints each one as soon as it is ready. They all
+read the same cached history and info (src/market_data.py), so the three
+requests cost one download, and an error in one panel no longer blanks the
+others.
+"""
+
+PRICE_STYLE = {'width':'20%', 'display':'inline-block', 'fontSize': '150%'}
+
+def shown_ticker(ticker, submitted):
+    '''
+    DROPDOWN VALUE OF THE TICKER ON SCREEN. ONLY A "Chart" CLICK PICKS UP THE DROPDOWN, ANY
+    OTHER TRIGGER (REFRESH, ZOOM, GRANULARITY) KEEPS THE LAST SUBMITTED TICKER
+    '''
+    triggers = [t['prop_id'] for t in dash.callback_context.triggered]
+    if submitted is None or 'submit-button-state.n_clicks' in triggers:
+        return ticker
+    return submitted
+
+# THE DROPDOWN VALUE IS COPIED IN THE BROWSER, NO ROUND-TRIP
+app.clientside_callback(
+    ClientsideFunction(namespace='tickerbuzz', function_name='submitted_ticker'),
+    Output('submitted-ticker', 'data'),
+    [Input('submit-button-state', 'n_clicks')],
+    [State('stock_ticker', 'value')]
+)
 
 @app.callback(
     # OUTPUT
@@ -357,466 +460,59 @@ app.layout = html.Div(children=[NAVBAR, BODY, FOOTER])
         Output('stock-price-change','style'), # PRICE CHANGE FONT COLOR
         Output('stock-price-percent-change','children'), # PRICE PERCENT CHANGE
         Output('stock-price-percent-change','style'), # PRICE PERCENT CHANGE FONT COLOR
-        Output('stock-table-info','children'), # STOCK TABLE STATS
-        Output("live-stock-chart", "figure")
+        Output('stock-data-updating','style'), # SHOWN WHILE SERVING STALE DATA
+        Output('stock-refresh-interval','disabled'), # POLL UNTIL THE DATA IS FRESH AGAIN
     ],
     # INPUT (BUTTON)
     [
-        Input('submit-button-state','n_clicks')
+        Input('submit-button-state','n_clicks'),
+        Input('stock-refresh-interval','n_intervals'),
     ],
     # STATE
     [
         State("stock_ticker", "value"), # TICKER INPUT
-        State("chart", "value")
+        State('submitted-ticker','data'),
     ],
 )
 
-def get_ticker(n_clicks, ticker, chart_name):
+def get_ticker(n_clicks, n_intervals, ticker, submitted):
 
-    ticker = ticker_list[ticker][0]
+    ticker = ticker_list[shown_ticker(ticker, submitted)][0]
 
     if n_clicks >= 1:  # CHECKING FOR USER TO CLICK SUBMIT BUTTON
 
+        warmup.record_request(ticker)
+
         # LOADING DATA
         # start_date = datetime.now().date() - timedelta(days=5 * 365)
         # end_data = datetime.now().date()
         # df = yf.get_data(
         #     ticker, start_date=start_date, end_date=end_data, interval="1d"
         # )
-        df = yfinance.Ticker(ticker).history(period='5y')
-        stock = Sdf.retype(df)
-
-        # -*- SELECTING GRAPH TYPE -*-
-
-        # LINE PLOT
-        if chart_name == "Line":
-            fig = go.Figure(
-                data=[
-                    go.Scatter(
-                        x=list(df.index), y=list(df.close), fill="tozeroy", name="Adj. Close"
-                    )
-                ],
-                layout={
-                    "showlegend": True,
-                    "plot_bgcolor": colors["background"],
-                    "paper_bgcolor": colors["background"],
-                    "font": {"color": colors["text"]},
-                    'margin': dict(l=40, r=20, t=60, b=20),
-                },
-            )
-
-            fig.update_xaxes(
-                rangeslider_visible=True,
-                rangeselector=dict(
-                    activecolor="rgb(177,183,248)",
-                    bgcolor=colors["background"],
-                    buttons=list(
-                        [
-                            dict(count=7, label="10D",
-                                 step="day", stepmode="backward"),
-                            dict(
-                                count=15, label="15D", step="day", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="1m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=3, label="3m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=6, label="6m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="1y", step="year", stepmode="backward"
-                            ),
-                            dict(
-                                count=5, label="5y", step="year", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="YTD", step="year", stepmode="todate"
-                            ),
-                            dict(step="all"),
-                        ]
-                    ),
-                )
-            )
-
-        # CANDLESTICK
-        if chart_name == "Candlestick":
-            fig = go.Figure(
-                data=[
-                    go.Candlestick(
-                        x=list(df.index),
-                        open=list(df.open),
-                        high=list(df.high),
-                        low=list(df.low),
-                        close=list(df.close),
-                        name="Candlestick",
-                    )
-                ],
-                layout={
-                    "showlegend": True,
-                    "plot_bgcolor": colors["background"],
-                    "paper_bgcolor": colors["background"],
-                    "font": {"color": colors["text"]},
-                    'margin': dict(l=40, r=20, t=60, b=20),
-                },
-            )
-
-            fig.update_xaxes(
-                rangeslider_visible=True,
-                rangeselector=dict(
-                    activecolor="rgb(177,183,248)",
-                    bgcolor=colors["background"],
-                    buttons=list(
-                        [
-                            dict(count=7, label="10D",
-                                 step="day", stepmode="backward"),
-                            dict(
-                                count=15, label="15D", step="day", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="1m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=3, label="3m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=6, label="6m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="1y", step="year", stepmode="backward"
-                            ),
-                            dict(
-                                count=5, label="5y", step="year", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="YTD", step="year", stepmode="todate"
-                            ),
-                            dict(step="all"),
-                        ]
-                    ),
-                ),
-            )
-
-        # SIMPLE MOVING AVERAGE
-        if chart_name == "SMA":
-            close_ma_10 = df.close.rolling(10).mean()
-            close_ma_15 = df.close.rolling(15).mean()
-            close_ma_30 = df.close.rolling(30).mean()
-            close_ma_100 = df.close.rolling(100).mean()
-            fig = go.Figure(
-                data=[
-                    go.Scatter(
-                        x=list(close_ma_10.index), y=list(close_ma_10), name="10 Days"
-                    ),
-                    go.Scatter(
-                        x=list(close_ma_15.index), y=list(close_ma_15), name="15 Days"
-                    ),
-                    go.Scatter(
-                        x=list(close_ma_30.index), y=list(close_ma_15), name="30 Days"
-                    ),
-                    go.Scatter(
-                        x=list(close_ma_100.index), y=list(close_ma_15), name="100 Days"
-                    ),
-                ],
-                layout={
-                    "showlegend": True,
-                    "plot_bgcolor": colors["background"],
-                    "paper_bgcolor": colors["background"],
-                    "font": {"color": colors["text"]},
-                    'margin': dict(l=40, r=20, t=60, b=20),
-                },
-            )
-
-            fig.update_xaxes(
-                rangeslider_visible=True,
-                rangeselector=dict(
-                    activecolor="rgb(177,183,248)",
-                    bgcolor=colors["background"],
-                    buttons=list(
-                        [
-                            dict(count=7, label="10D",
-                                 step="day", stepmode="backward"),
-                            dict(
-                                count=15, label="15D", step="day", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="1m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=3, label="3m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=6, label="6m", step="month", stepmode="backward"
-                            ),
-                            dict(count=1, label="1y", step="year",
-                                 stepmode="backward"),
-                            dict(count=5, label="5y", step="year",
-                                 stepmode="backward"),
-                            dict(count=1, label="YTD",
-                                 step="year", stepmode="todate"),
-                            dict(step="all"),
-                        ]
-                    ),
-                ),
-            )
-
-        # OPEN_HIGH_LOW_CLOSE
-        if chart_name == "OHLC":
-            fig = go.Figure(
-                data=[
-                    go.Ohlc(
-                        x=df.index,
-                        open=df.open,
-                        high=df.high,
-                        low=df.low,
-                        close=df.close,
-                    )
-                ],
-                layout={
-                    "showlegend": True,
-                    "plot_bgcolor": colors["background"],
-                    "paper_bgcolor": colors["background"],
-                    "font": {"color": colors["text"]},
-                    'margin': dict(l=40, r=20, t=60, b=20),
-                },
-            )
-
-            fig.update_xaxes(
-                rangeslider_visible=True,
-                rangeselector=dict(
-                    activecolor="rgb(177,183,248)",
-                    bgcolor=colors["background"],
-                    buttons=list(
-                        [
-                            dict(count=7, label="10D",
-                                 step="day", stepmode="backward"),
-                            dict(
-                                count=15, label="15D", step="day", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="1m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=3, label="3m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=6, label="6m", step="month", stepmode="backward"
-                            ),
-                            dict(count=1, label="1y", step="year",
-                                 stepmode="backward"),
-                            dict(count=5, label="5y", step="year",
-                                 stepmode="backward"),
-                            dict(count=1, label="YTD",
-                                 step="year", stepmode="todate"),
-                            dict(step="all"),
-                        ]
-                    ),
-                ),
-            )
-
-        # EXPONENTIAL MOVING AVERAGE
-        if chart_name == "EMA":
-            close_ema_10 = df.close.ewm(span=10).mean()
-            close_ema_15 = df.close.ewm(span=15).mean()
-            close_ema_30 = df.close.ewm(span=30).mean()
-            close_ema_100 = df.close.ewm(span=100).mean()
-            fig = go.Figure(
-                data=[
-                    go.Scatter(
-                        x=list(close_ema_10.index), y=list(close_ema_10), name="10 Days"
-                    ),
-                    go.Scatter(
-                        x=list(close_ema_15.index), y=list(close_ema_15), name="15 Days"
-                    ),
-                    go.Scatter(
-                        x=list(close_ema_30.index), y=list(close_ema_30), name="30 Days"
-                    ),
-                    go.Scatter(
-                        x=list(close_ema_100.index),
-                        y=list(close_ema_100),
-                        name="100 Days",
-                    ),
-                ],
-                layout={
-                    "showlegend": True,
-                    "plot_bgcolor": colors["background"],
-                    "paper_bgcolor": colors["background"],
-                    "font": {"color": colors["text"]},
-                    "margin": dict(l=60, r=20, t=60, b=0),
-                },
-            )
-
-            fig.update_xaxes(
-                rangeslider_visible=True,
-                rangeselector=dict(
-                    activecolor="rgb(177,183,248)",
-                    bgcolor=colors["background"],
-                    buttons=list(
-                        [
-                            dict(count=7, label="10D",
-                                 step="day", stepmode="backward"),
-                            dict(
-                                count=15, label="15D", step="day", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="1m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=3, label="3m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=6, label="6m", step="month", stepmode="backward"
-                            ),
-                            dict(count=1, label="1y", step="year",
-                                 stepmode="backward"),
-                            dict(count=5, label="5y", step="year",
-                                 stepmode="backward"),
-                            dict(count=1, label="YTD",
-                                 step="year", stepmode="todate"),
-                            dict(step="all"),
-                        ]
-                    ),
-                ),
-            )
-
-        # MOVING AVERAGE CONVERGENCE DIVERGENCE
-        if chart_name == "MACD":
-            df["MACD"], df["signal"], df["hist"] = (
-                stock["macd"],
-                stock["macds"],
-                stock["macdh"],
-            )
-            fig = go.Figure(
-                data=[
-                    go.Scatter(x=list(df.index), y=list(df.MACD), name="MACD"),
-                    go.Scatter(x=list(df.index), y=list(df.signal), name="Signal"),
-                    go.Scatter(
-                        x=list(df.index),
-                        y=list(df["hist"]),
-                        line=dict(color="royalblue", width=2, dash="dot"),
-                        name="Histogram",
-                    ),
-                ],
-                layout={
-                    "showlegend": True,
-                    "plot_bgcolor": colors["background"],
-                    "paper_bgcolor": colors["background"],
-                    "font": {"color": colors["text"]},
-                    "margin": dict(l=60, r=20, t=60, b=0),
-                },
-            )
-
-            fig.update_xaxes(
-                rangeslider_visible=True,
-                rangeselector=dict(
-                    activecolor="rgb(177,183,248)",
-                    bgcolor=colors["background"],
-                    buttons=list(
-                        [
-                            dict(count=7, label="10D",
-                                 step="day", stepmode="backward"),
-                            dict(
-                                count=15, label="15D", step="day", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="1m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=3, label="3m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=6, label="6m", step="month", stepmode="backward"
-                            ),
-                            dict(count=1, label="1y", step="year",
-                                 stepmode="backward"),
-                            dict(count=5, label="5y", step="year",
-                                 stepmode="backward"),
-                            dict(count=1, label="YTD",
-                                 step="year", stepmode="todate"),
-                            dict(step="all"),
-                        ]
-                    ),
-                ),
-            )
-
-        # RELATIVE STRENGTH INDEX
-        if chart_name == "RSI":
-            rsi_6 = stock["rsi_6"]
-            rsi_12 = stock["rsi_12"]
-            fig = go.Figure(
-                data=[
-                    go.Scatter(x=list(df.index), y=list(
-                        rsi_6), name="RSI 6 Day"),
-                    go.Scatter(x=list(df.index), y=list(
-                        rsi_12), name="RSI 12 Day"),
-                ],
-                layout={
-                    "showlegend": True,
-                    "plot_bgcolor": colors["background"],
-                    "paper_bgcolor": colors["background"],
-                    "font": {"color": colors["text"]},
-                    "margin": dict(l=60, r=20, t=60, b=0),
-                },
-            )
-            fig.update_xaxes(
-                rangeslider_visible=True,
-                rangeselector=dict(
-                    activecolor="rgb(177,183,248)",
-                    bgcolor=colors["background"],
-                    buttons=list(
-                        [
-                            dict(count=7, label="10D",
-                                 step="day", stepmode="backward"),
-                            dict(
-                                count=15, label="15D", step="day", stepmode="backward"
-                            ),
-                            dict(
-                                count=1, label="1m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=3, label="3m", step="month", stepmode="backward"
-                            ),
-                            dict(
-                                count=6, label="6m", step="month", stepmode="backward"
-                            ),
-                            dict(count=1, label="1y", step="year",
-                                 stepmode="backward"),
-                            dict(count=5, label="5y", step="year",
-                                 stepmode="backward"),
-                            dict(count=1, label="YTD",
-                                 step="year", stepmode="todate"),
-                            dict(step="all"),
-                        ]
-                    ),
-                ),
-            )
+        bundle = get_market_bundle(ticker)
 
         # FOR DEFAULT SETTING
         if ticker == '':
             return 'Please select a stock ticker', \
-                    '','',{'width':'20%', 'display':'inline-block', 'fontSize': '150%'},'', \
-                    {'width':'20%', 'display':'inline-block', 'fontSize': '150%'}, None, {'data':None}
+                    '','',PRICE_STYLE,'',PRICE_STYLE, \
+                    {'display':'none'}, True
                 
-        # OBTAIN STOCK PRICE AND STATS
-        stock = yfinance.Ticker(ticker)
-
         # CATCH IF STOCK EXISTS
-        if stock.history(period='ytd').shape[0] == 0:
+        if not bundle['has_ytd']:
             return 'Something went wrong', '$##.##', '##.##', \
-                    {'width':'20%', 'display':'inline-block', 'fontSize': '150%'}, '##.##%', \
-                    {'width':'20%', 'display':'inline-block', 'fontSize': '150%'}, None, {'data':None}
+                    PRICE_STYLE, '##.##%', PRICE_STYLE, \
+                    {'display':'none'}, True
 
         ### STOCK STATS FOR INFO BOX ###
         try:
             # NAME AND PRICE
-            stock_name = stock.info['longName']
-            price_list = stock.history(period='1y')['Close'].tolist()
-            price = f'${price_list[-1]:.2f}'
+            stock_info = bundle['info']
+            stock_name = stock_info['longName']
+            last_close, prev_close = bundle['last_close'], bundle['prev_close']
+            price = f'${last_close:.2f}'
             # PRICE CHANGE
-            price_change = price_list[-1] - price_list[-2]
-            price_percent_change = (price_list[-1]/price_list[-2])-1
+            price_change = last_close - prev_close
+            price_percent_change = (last_close/prev_close)-1
 
             if price_change > 0:
                 price_change_color = {'color':'green'}
@@ -830,15 +526,137 @@ def get_ticker(n_clicks, ticker, chart_name):
             price_change = f'{price_change:.2f}'
             price_percent_change = f'{price_percent_change*100:,.2f}%'
 
-            table = getStockTable(stock.history(period='1y').reset_index(), stock.info)
+            # STALE DATA IS SHOWN RIGHT AWAY WHILE A BACKGROUND REFRESH RUNS
+            updating_style = {'display': 'inline-block'} if bundle['stale'] else {'display': 'none'}
 
         except:
             return 'Something went wrong(2)', '$##.##', '##.##', \
-                {'width':'20%', 'display':'inline-block', 'fontSize': '150%'}, '##.##%', \
-                {'width':'20%', 'display':'inline-block', 'fontSize': '150%'}, None, {'data':None}
+                PRICE_STYLE, '##.##%', PRICE_STYLE, \
+                {'display':'none'}, True
 
     return stock_name, price, price_change, price_change_color, \
-            price_percent_change, price_change_color, table, fig
+            price_percent_change, price_change_color, \
+            updating_style, not bundle['stale']
+
+@app.callback(
+    Output('stock-table-info','children'), # STOCK TABLE STATS
+    [
+        Input('submit-button-state','n_clicks'),
+        Input('stock-refresh-interval','n_intervals'),
+    ],
+    [State("stock_ticker", "value"), State('submitted-ticker','data')]
+)
+
+def get_stock_table(n_clicks, n_intervals, ticker, submitted):
+
+    ticker = ticker_list[shown_ticker(ticker, submitted)][0]
+
+    if n_clicks >= 1:
+
+        bundle = get_market_bundle(ticker)
+        if not bundle['has_ytd']:
+            return None
+
+        try:
+            return getStockTable(bundle['one_year'].reset_index(), bundle['info'])
+        except:
+            return None
+
+@app.callback(
+    [
+        Output('chart-data','data'), # DRAWN BY THE CLIENTSIDE CALLBACK BELOW
+        Output('chart-period','data'),
+    ],
+    [
+        Input('submit-button-state','n_clicks'),
+        Input('stock-refresh-interval','n_intervals'),
+        Input('live-stock-chart','relayoutData'), # ZOOM, RE-FETCH THE VISIBLE RANGE AT FULL DETAIL
+        Input('chart-width','data'),
+    ],
+    [
+        State("stock_ticker", "value"),
+        State('submitted-ticker','data'),
+        State('chart-period','data'),
+    ]
+)
+
+def get_chart_data(n_clicks, n_intervals, relayout_data, chart_width, ticker, submitted, loaded_period):
+
+    ticker = ticker_list[shown_ticker(ticker, submitted)][0]
+
+    if n_clicks >= 1:
+
+        # A ZOOM ONLY REDRAWS THE CHART, ANY OTHER RELAYOUT EVENT (AUTOSIZE, LEGEND) IS IGNORED
+        triggers = [t['prop_id'] for t in dash.callback_context.triggered]
+        zoomed = triggers == ['live-stock-chart.relayoutData']
+        view_range = x_range(relayout_data) if zoomed else None
+        if view_range is False:
+            raise PreventUpdate
+
+        # A NEW TICKER PAINTS THE LAST YEAR FIRST, A REFRESH OR ZOOM KEEPS WHAT IS LOADED
+        period = loaded_period
+        if not period or 'submit-button-state.n_clicks' in triggers:
+            period = FIRST_PAINT_PERIOD
+
+        # THE CHART ONLY NEEDS THE HISTORY, IT DOES NOT WAIT FOR THE COMPANY INFO. THE FIRST PAINT'S
+        # INDICATORS ARE COMPUTED FROM A FIXED LOOKBACK IN FRONT OF IT (src/market_data.py)
+        if period == FULL_PERIOD:
+            history, _ = fetch_history(ticker, period=FULL_PERIOD)
+            seed = history
+        else:
+            history, seed, _ = first_paint_history(ticker)
+        if history.shape[0] == 0:
+            return None, None
+
+        # 5Y / ALL / PANNING PAST THE FIRST LOADED BAR DOWNLOADS AND SWAPS IN THE FULL HISTORY
+        if zoomed and period != FULL_PERIOD and (view_range is None or view_range[0] < history.index[0]):
+            period = FULL_PERIOD
+            history, _ = fetch_history(ticker, period=FULL_PERIOD)
+            seed = history
+
+        # EVERY CHART TYPE'S DATA, THE BROWSER PICKS THE GRAPH TYPE WITHOUT CALLING BACK
+        return chart_data(ticker, history, x_range=view_range, width=chart_width, seed=seed), period
+
+# CHART TYPE SWITCHES ARE HANDLED ENTIRELY IN THE BROWSER (assets/charts.js)
+app.clientside_callback(
+    ClientsideFunction(namespace='tickerbuzz', function_name='render_chart'),
+    Output('live-stock-chart', 'figure'),
+    [Input('chart-data', 'data'), Input('chart', 'value')],
+    [State('chart-layouts', 'data')]
+)
+
+app.clientside_callback(
+    ClientsideFunction(namespace='tickerbuzz', function_name='chart_width'),
+    Output('chart-width', 'data'),
+    [Input('submit-button-state', 'n_clicks')]
+)
+
+@app.callback(
+    Output('buzz-chart','figure'),
+    [
+        Input('submit-button-state','n_clicks'),
+        Input('buzz-granularity','value'),
+        Input('buzz-refresh-interval','n_intervals'),
+    ],
+    [State("stock_ticker", "value"), State('submitted-ticker','data')]
+)
+
+def get_buzz(n_clicks, granularity, n_intervals, ticker, submitted):
+
+    ticker = ticker_list[shown_ticker(ticker, submitted)][0]
+
+    if n_clicks >= 1:
+
+        try:
+            # A PRIMARY KEY RANGE SCAN ON ONE ROLLUP TABLE, INDEPENDENT OF HOW MANY COMMENTS ARE STORED
+            query, params = mentions.buzz_query(granularity, ticker)
+            return buzz_figure(pd.read_sql(query, con=engine, params=params))
+
+        except Exception as e:
+            with open('errors.txt', 'a') as f:
+                f.write(str(e))
+                f.write('\n')
+            return {'data': [], 'layout': {'height': 220}}
 
 #------------------------FETCH REDDIT/TWITTER MENTIONS-------------------------#
 
@@ -875,38 +693,77 @@ def generate_reddit_cards(df):
 
 @app.callback(
     # OUTPUT
-    Output('reddit-comments','children'),
+    [
+        Output('reddit-page','data'),
+        Output('reddit-cursor','data'),
+        Output('reddit-load-more','style'),
+    ],
     # INPUT
-    [Input('submit-button-state','n_clicks')], # BUTTON
+    [
+        Input('submit-button-state','n_clicks'), # BUTTON
+        Input('reddit-load-more','n_clicks'), # NEXT PAGE OF THE SAME TICKER OR SEARCH
+        Input('reddit-search','value'),
+    ],
     # STATE
-    [State("stock_ticker", "value")] # TICKER INPUT
+    [
+        State("stock_ticker", "value"), # TICKER INPUT
+        State('submitted-ticker','data'),
+        State('reddit-cursor','data'),
+    ]
 )
 
-def update_mentions(n_clicks, ticker):
-
-    company = ticker_list[ticker][1]
-    ticker = ticker_list[ticker][0]
+def update_mentions(n_clicks, load_more_clicks, search, ticker, submitted, cursor):
 
     if n_clicks >= 1: # CHECKING FOR USER TO CLICK SUBMIT BUTTON
 
+        # A NEW TICKER OR SEARCH STARTS OVER FROM THE NEWEST COMMENT, "Load more" PAGES WHAT THE
+        # CURSOR WAS MADE FOR, WHATEVER THE DROPDOWN AND SEARCH BOX SAY NOW
+        triggers = [t['prop_id'] for t in dash.callback_context.triggered]
+        load_more = triggers == ['reddit-load-more.n_clicks']
+        if load_more:
+            if not cursor:
+                raise PreventUpdate
+            ticker, search, cursor = cursor[0], cursor[1], cursor[2:]
+        else:
+            ticker, search, cursor = shown_ticker(ticker, submitted), mentions.search_term(search), None
+
         try:
-            reddit_df = pd.read_sql(
-                """SELECT * FROM (
-                    SELECT DISTINCT ON (body) *
-                    FROM reddit_data
-                    WHERE body LIKE %s OR body LIKE %s
-                    ORDER BY body, date_time DESC
-                ) t
-                ORDER BY date_time DESC LIMIT 20;""", con=engine, params=('%'+company+'%', '%$'+ticker+' %',))
+            # MENTIONS EXTRACTED AT INGEST (reddit_stream.py), OR A TRIGRAM INDEX SEARCH IF ONE WAS TYPED
+            query, params = mentions.feed_query(ticker_list[ticker][0], search, cursor)
+            reddit_df = pd.read_sql(query, con=engine, params=params)
 
+            cursor = mentions.next_cursor(reddit_df)
+            if cursor:
+                cursor = [ticker, search] + cursor
             reddit_df = reddit_df[['subreddit','date_time','body']]
 
-            return generate_reddit_cards(reddit_df)
+            page = {'cards': generate_reddit_cards(reddit_df), 'reset': not load_more}
+            return page, cursor, {'display': 'inline-block'} if cursor else {'display': 'none'}
 
         except Exception as e:
             with open('errors.txt', 'a') as f:
                 f.write(str(e))
                 f.write('\n')
+            return {'cards': [], 'reset': not load_more}, None, {'display': 'none'}
+
+app.clientside_callback(
+    ClientsideFunction(namespace='tickerbuzz', function_name='append_mentions'),
+    Output('reddit-comments', 'children'),
+    [Input('reddit-page', 'data')],
+    [State('reddit-comments', 'children')]
+)
 
 server = app.server
 dev_server = app.run_server
+
+compression.init_app(server)
+
+# KEEP THE DEFAULT AND MOST REQUESTED TICKERS WARM IN THE BACKGROUND
+warmup.start()
+
+@server.route('/stats/cache')
+def get_cache_stats():
+    stats = cache_stats()
+    stats['indicators'] = result_stats
+    stats['compression'] = compression.stats
+    return flask.jsonify(stats)
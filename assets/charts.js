@@ -0,0 +1,88 @@
+/* Clientside chart rendering
+––––––––––––––––––––––––––––––––––––––––––––––––––
+The server puts a ticker's bars and every indicator into the chart-data store
+(src/figures.py, chart_data). These functions build the figure for the selected
+chart type in the browser, with the layouts from the chart-layouts store
+(CHART_LAYOUTS in src/figures.py), so switching chart types never needs a
+round-trip.
+*/
+
+(function() {
+    var DAYS = [10, 15, 30, 100];
+
+    function line(data, y, name) {
+        return {type: "scatter", x: data.line.x, y: y, name: name};
+    }
+
+    function bars(type, data) {
+        return {
+            type: type,
+            x: data.bars.x,
+            open: data.bars.open,
+            high: data.bars.high,
+            low: data.bars.low,
+            close: data.bars.close
+        };
+    }
+
+    function movingAverages(kind) {
+        return function(data) {
+            return DAYS.map(function(days) {
+                return line(data, data.line.series["close_" + days + "_" + kind], days + " Days");
+            });
+        };
+    }
+
+    var TRACES = {
+        "Line": function(data) {
+            var trace = line(data, data.line.series.close, "Adj. Close");
+            trace.fill = "tozeroy";
+            return [trace];
+        },
+        "Candlestick": function(data) {
+            var trace = bars("candlestick", data);
+            trace.name = "Candlestick";
+            return [trace];
+        },
+        "SMA": movingAverages("sma"),
+        "EMA": movingAverages("ema"),
+        "MACD": function(data) {
+            var histogram = line(data, data.line.series.macdh, "Histogram");
+            histogram.line = {color: "royalblue", width: 2, dash: "dot"};
+            return [
+                line(data, data.line.series.macd, "MACD"),
+                line(data, data.line.series.macds, "Signal"),
+                histogram
+            ];
+        },
+        "RSI": function(data) {
+            return [
+                line(data, data.line.series.rsi_6, "RSI 6 Day"),
+                line(data, data.line.series.rsi_12, "RSI 12 Day")
+            ];
+        },
+        "OHLC": function(data) {
+            return [bars("ohlc", data)];
+        }
+    };
+
+    // OTHER ASSET FILES ADD THEIR OWN FUNCTIONS TO THE SAME NAMESPACE
+    window.dash_clientside = window.dash_clientside || {};
+    window.dash_clientside.tickerbuzz = Object.assign({}, window.dash_clientside.tickerbuzz, {
+        render_chart: function(data, chart_name, layouts) {
+            if (!data || !TRACES[chart_name]) {
+                return {data: []};
+            }
+            // ONE uirevision PER TICKER AND CHART TYPE, A ZOOM SURVIVES NEW DATA
+            var layout = Object.assign({}, layouts[chart_name], {uirevision: data.ticker + chart_name});
+            return {data: TRACES[chart_name](data), layout: layout};
+        },
+        chart_width: function(n_clicks) {
+            var graph = document.getElementById("live-stock-chart");
+            return graph ? graph.offsetWidth : window.innerWidth;
+        },
+        submitted_ticker: function(n_clicks, ticker) {
+            return ticker;
+        }
+    });
+})();
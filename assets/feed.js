@@ -0,0 +1,19 @@
+/* Reddit mention feed
+––––––––––––––––––––––––––––––––––––––––––––––––––
+The server sends one page of cards at a time (reddit-page). A new ticker
+replaces the feed, "Load more" appends to it here in the browser, so the
+cards already shown are never sent back to the server.
+*/
+
+(function() {
+    window.dash_clientside = window.dash_clientside || {};
+    window.dash_clientside.tickerbuzz = Object.assign({}, window.dash_clientside.tickerbuzz, {
+        append_mentions: function(page, shown) {
+            if (!page) {
+                return window.dash_clientside.no_update;
+            }
+            var cards = page.reset || !shown ? [] : [].concat(shown);
+            return cards.concat(page.cards);
+        }
+    });
+})();
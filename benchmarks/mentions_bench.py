@@ -0,0 +1,93 @@
+"""
+Microbenchmark for ticker extraction (src/mentions.py). Prints comments per
+second for the old one-substring-test-per-needle loop and for the Aho-Corasick
+matcher (pure Python, and pyahocorasick when it is installed).
+
+    python benchmarks/mentions_bench.py                 synthetic WSB-style corpus
+    python benchmarks/mentions_bench.py --db 20000      newest comments in DATABASE_URL
+
+Run from the repository root.
+"""
+import os
+import sys
+import time
+import pickle
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import mentions
+
+FILLER = (
+    "i think the market is going to dump tomorrow but my calls expire friday so "
+    "whatever, holding until the earnings call. anyone else loading up on puts? "
+    "this sub is a casino lol. bought the dip again and it kept dipping. guidance "
+    "looked weak and the chart is a mess but the volume is insane today. "
+    "not financial advice, do your own DD before you yolo the rent money"
+).split()
+
+def synthetic_corpus(ticker_list, n, seed=0):
+    # COMMENT LENGTHS AND MENTION RATES ROUGHLY LIKE r/wallstreetbets: MOSTLY SHORT, A THIRD MENTION A TICKER
+    rng = random.Random(seed)
+    tickers = list(ticker_list.values())
+    corpus = []
+    for _ in range(n):
+        words = [rng.choice(FILLER) for _ in range(int(rng.lognormvariate(3.2, 0.8)) + 1)]
+        for _ in range(rng.choice((0, 0, 1, 1, 2))):
+            symbol, alias = rng.choice(tickers)
+            words.insert(rng.randrange(len(words) + 1), rng.choice(('$' + symbol, symbol, alias)))
+        corpus.append(' '.join(words)[:2000])
+    return corpus
+
+def db_corpus(n):
+    from dotenv import load_dotenv
+    from sqlalchemy import create_engine
+    load_dotenv()
+    engine = create_engine(os.getenv("DATABASE_URL"))
+    rows = engine.execute("SELECT body FROM reddit_data ORDER BY date_time DESC LIMIT %s", (n,))
+    return [body for body, in rows if body]
+
+def naive_extract(needles, body):
+    # WHAT A LOOP OVER EVERY NEEDLE COSTS, THE APPROACH THE AUTOMATON REPLACES
+    return {symbol for needle, symbol in needles if needle in body}
+
+def bench(name, extract, corpus, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in corpus:
+            extract(body)
+        best = min(best, time.perf_counter() - start)
+    chars = sum(len(body) for body in corpus)
+    print('%-28s %10.0f comments/s %8.1f MB/s' % (name, len(corpus) / best, chars / best / 1e6))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', type=int, default=20000, help='synthetic comments (default 20000)')
+    parser.add_argument('--db', type=int, metavar='N', help='use the newest N comments from DATABASE_URL')
+    args = parser.parse_args()
+
+    with open('tickers.pickle', 'rb') as f:
+        ticker_list = pickle.load(f)
+    corpus = db_corpus(args.db) if args.db else synthetic_corpus(ticker_list, args.n)
+    print('%d comments, %d tickers, mean length %.0f chars' % (
+        len(corpus), len(ticker_list), sum(map(len, corpus)) / len(corpus)))
+
+    needles = [(alias, symbol) for symbol, alias in ticker_list.values()]
+    needles += [('$' + symbol, symbol) for symbol, alias in ticker_list.values()]
+    bench('substring loop', lambda body: naive_extract(needles, body), corpus)
+
+    start = time.perf_counter()
+    python_matcher = mentions.Matcher(ticker_list, automaton=mentions._Automaton())
+    print('%-28s %10.3f s' % ('build (pure Python)', time.perf_counter() - start))
+    bench('aho-corasick (pure Python)', python_matcher.extract, corpus)
+
+    if mentions.ahocorasick is not None:
+        c_matcher = mentions.Matcher(ticker_list)
+        bench('aho-corasick (pyahocorasick)', c_matcher.extract, corpus)
+        assert all(c_matcher.extract(body) == python_matcher.extract(body) for body in corpus)
+    else:
+        print('pyahocorasick is not installed, skipping the C automaton')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark for the Reddit feed queries on a synthetic multi-million-row comment
+table in a local Postgres. Everything lives in a scratch "bench" schema, which
+is dropped and rebuilt on every run.
+
+    createdb tickerbuzz_bench
+    BENCH_DATABASE_URL=postgresql://localhost/tickerbuzz_bench python benchmarks/mentions_search_bench.py --rows 3000000
+
+It loads the rows with migrations/0001 applied and times three queries:
+- the old LIKE feed query;
+- the mentions feed query (src/mentions.FEED_QUERY);
+- a free-text search for the alias (src/mentions.SEARCH_QUERY).
+It then applies the remaining migrations (the trigram indexes and the
+body-hash dedup) and times the same queries again. Times are the median server-side execution time from EXPLAIN ANALYZE.
+"""
+import os
+import sys
+import time
+import pickle
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sqlalchemy import create_engine
+from src import mentions, migrate
+
+FILLER = (
+    "i think the market is going to dump tomorrow but my calls expire friday so whatever "
+    "holding until the earnings call anyone else loading up on puts this sub is a casino "
+    "bought the dip again and it kept dipping guidance looked weak volume is insane today"
+).split()
+
+# (SYMBOL, ALIAS) PAIRS THE FEED QUERIES ARE TIMED FOR
+BENCH_TICKERS = [('DIS', 'Disney'), ('TSLA', 'Tesla'), ('AAPL', 'Apple'), ('GME', 'GameStop')]
+
+OLD_FEED_QUERY = """SELECT * FROM (
+        SELECT DISTINCT ON (body) *
+        FROM reddit_data
+        WHERE body LIKE %(company)s OR body LIKE %(cashtag)s
+        ORDER BY body, date_time DESC
+    ) t
+    ORDER BY date_time DESC LIMIT 20;"""
+
+def load_rows(engine, rows, aliases):
+    # ONE IN FOUR COMMENTS MENTIONS A RANDOM ALIAS, THE REST IS FILLER
+    words = FILLER * 3 + aliases
+    engine.execute("""
+        INSERT INTO reddit_data (date_time, subreddit, title, body)
+        SELECT now() - g * interval '1 second',
+               (ARRAY['wallstreetbets', 'investing', 'stocks', 'pennystocks'])[1 + g %% 4],
+               'Daily discussion thread ' || (g %% 5000),
+               array_to_string(ARRAY(
+                   SELECT w[1 + floor(random() * array_length(w, 1))::int]
+                   FROM generate_series(1, 10 + (g %% 40))
+               ), ' ')
+        FROM generate_series(1, %(rows)s) g, (SELECT %(words)s::text[] AS w) words
+    """, {'rows': rows, 'words': words})
+    for symbol, alias in BENCH_TICKERS:
+        engine.execute("""
+            INSERT INTO mentions (comment_id, ticker, ts)
+            SELECT id, %(symbol)s, date_time FROM reddit_data WHERE body LIKE %(pattern)s
+        """, {'symbol': symbol, 'pattern': mentions.like_pattern(alias)})
+    engine.execute("ANALYZE")
+
+def execution_ms(engine, query, params, repeat):
+    times = []
+    for _ in range(repeat):
+        plan = engine.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query, params).scalar()
+        times.append(plan[0]['Execution Time'])
+    return statistics.median(times)
+
+def run_queries(engine, label, repeat):
+    print('\n%s' % label)
+    for symbol, alias in BENCH_TICKERS:
+        old = execution_ms(engine, OLD_FEED_QUERY, {
+            'company': '%' + alias + '%', 'cashtag': '%$' + symbol + ' %'}, repeat)
+        new = execution_ms(engine, *mentions.feed_query(symbol), repeat=repeat)
+        search = execution_ms(engine, *mentions.feed_query(symbol, search=alias.lower()), repeat=repeat)
+        print('  %-6s old feed %9.1f ms   new feed %9.1f ms   search %9.1f ms' % (symbol, old, new, search))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000000, help='synthetic comments (default 2000000)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per query (default 5)')
+    args = parser.parse_args()
+
+    url = os.getenv('BENCH_DATABASE_URL', 'postgresql://localhost/tickerbuzz_bench')
+    admin = create_engine(url)
+    admin.execute("DROP SCHEMA IF EXISTS bench CASCADE")
+    admin.execute("CREATE SCHEMA bench")
+    admin.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public")
+    engine = create_engine(url, connect_args={'options': '-c search_path=bench,public'})
+
+    with open('tickers.pickle', 'rb') as f:
+        aliases = [alias for symbol, alias in pickle.load(f).values()]
+    aliases = random.Random(0).sample(aliases, 200) + [alias for _, alias in BENCH_TICKERS]
+
+    # TABLES FROM THE FIRST MIGRATION ONLY, THE INDEXES COME AFTER THE BULK LOAD
+    migrate.applied(engine)
+    first_version, first_path = migrate.migrations()[0]
+    migrate._apply(engine, first_version, first_path)
+
+    start = time.perf_counter()
+    load_rows(engine, args.rows, aliases)
+    print('loaded %d comments in %.0f s' % (args.rows, time.perf_counter() - start))
+    run_queries(engine, 'without trigram indexes', args.repeat)
+
+    start = time.perf_counter()
+    migrate.upgrade(engine)
+    print('\nremaining migrations took %.0f s' % (time.perf_counter() - start))
+    engine.execute("ANALYZE")
+    run_queries(engine, 'with trigram indexes and deduplicated bodies', args.repeat)
+
+if __name__ == '__main__':
+    main()
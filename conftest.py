@@ -0,0 +1,3 @@
+"""
+Keeps the repository root importable, so the tests can import the src package.
+"""
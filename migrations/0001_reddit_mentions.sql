@@ -0,0 +1,19 @@
+-- COMMENTS FROM reddit_stream.py AND THE TICKERS EACH ONE MENTIONS (SEE src/mentions.py)
+CREATE TABLE IF NOT EXISTS reddit_data (
+    date_time TIMESTAMP,
+    subreddit VARCHAR(500),
+    title VARCHAR(500),
+    body VARCHAR(2000)
+);
+
+-- MENTIONS POINT AT THE COMMENT THEY CAME FROM
+ALTER TABLE reddit_data ADD COLUMN IF NOT EXISTS id BIGSERIAL PRIMARY KEY;
+
+CREATE TABLE IF NOT EXISTS mentions (
+    comment_id BIGINT NOT NULL REFERENCES reddit_data (id) ON DELETE CASCADE,
+    ticker VARCHAR(10) NOT NULL,
+    ts TIMESTAMP NOT NULL,
+    PRIMARY KEY (comment_id, ticker)
+);
+
+CREATE INDEX IF NOT EXISTS mentions_ticker_ts ON mentions (ticker, ts DESC);
@@ -0,0 +1,7 @@
+-- no-transaction: CREATE INDEX CONCURRENTLY KEEPS THE TABLE WRITABLE WHILE THE INDEX BUILDS
+-- TRIGRAM INDEXES LET LIKE/ILIKE '%...%' ON COMMENTS USE AN INDEX INSTEAD OF A SEQUENTIAL SCAN
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS reddit_data_body_trgm ON reddit_data USING gin (body gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS reddit_data_title_trgm ON reddit_data USING gin (title gin_trgm_ops);
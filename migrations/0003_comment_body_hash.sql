@@ -0,0 +1,23 @@
+-- ONE ROW PER COMMENT BODY: A REPOST UPDATES THE EXISTING ROW (src/mentions.py, ingest) INSTEAD OF
+-- ADDING A DUPLICATE, SO THE FEED NO LONGER NEEDS DISTINCT ON (body)
+ALTER TABLE reddit_data ADD COLUMN IF NOT EXISTS body_hash BYTEA;
+
+UPDATE reddit_data SET body_hash = decode(md5(coalesce(body, '')), 'hex') WHERE body_hash IS NULL;
+
+-- KEEP THE NEWEST COPY OF EVERY BODY, THE OLDER COPIES TAKE THEIR MENTIONS WITH THEM
+DELETE FROM reddit_data WHERE id IN (
+    SELECT id FROM (
+        SELECT id, row_number() OVER (
+            PARTITION BY body_hash ORDER BY date_time DESC NULLS LAST, id DESC
+        ) AS copy
+        FROM reddit_data
+    ) copies
+    WHERE copy > 1
+);
+
+ALTER TABLE reddit_data ALTER COLUMN body_hash SET NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS reddit_data_body_hash ON reddit_data (body_hash);
+
+-- NEWEST MATCHES FIRST WITHOUT SORTING THEM
+CREATE INDEX IF NOT EXISTS reddit_data_date_time ON reddit_data (date_time DESC);
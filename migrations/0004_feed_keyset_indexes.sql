@@ -0,0 +1,9 @@
+-- no-transaction: CREATE INDEX CONCURRENTLY KEEPS THE TABLES WRITABLE WHILE THE INDEXES BUILD
+-- THE FEED PAGES WITH (ts, id) < CURSOR, SO THE INDEXES END IN THE TIE-BREAKING ID
+CREATE INDEX CONCURRENTLY IF NOT EXISTS mentions_ticker_ts_id ON mentions (ticker, ts DESC, comment_id DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS mentions_ticker_ts;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS reddit_data_date_time_id ON reddit_data (date_time DESC, id DESC);
+
+DROP INDEX CONCURRENTLY IF EXISTS reddit_data_date_time;
@@ -0,0 +1,35 @@
+-- MENTIONS PER TICKER PER MINUTE, HOUR AND DAY, INCREMENTED AT INGEST (src/mentions.py) SO THE BUZZ
+-- CHART NEVER TOUCHES reddit_data OR mentions
+CREATE TABLE IF NOT EXISTS mention_counts_minute (
+    ticker VARCHAR(10) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    mentions INTEGER NOT NULL,
+    PRIMARY KEY (ticker, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS mention_counts_hour (
+    ticker VARCHAR(10) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    mentions INTEGER NOT NULL,
+    PRIMARY KEY (ticker, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS mention_counts_day (
+    ticker VARCHAR(10) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    mentions INTEGER NOT NULL,
+    PRIMARY KEY (ticker, bucket)
+);
+
+-- SEED FROM THE MENTIONS ALREADY STORED, INGEST KEEPS THEM CURRENT FROM HERE ON
+INSERT INTO mention_counts_minute (ticker, bucket, mentions)
+SELECT ticker, date_trunc('minute', ts), count(*) FROM mentions GROUP BY 1, 2
+ON CONFLICT DO NOTHING;
+
+INSERT INTO mention_counts_hour (ticker, bucket, mentions)
+SELECT ticker, date_trunc('hour', ts), count(*) FROM mentions GROUP BY 1, 2
+ON CONFLICT DO NOTHING;
+
+INSERT INTO mention_counts_day (ticker, bucket, mentions)
+SELECT ticker, date_trunc('day', ts), count(*) FROM mentions GROUP BY 1, 2
+ON CONFLICT DO NOTHING;
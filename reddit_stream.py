@@ -7,7 +7,9 @@ import datetime
 import pytz
 from unidecode import unidecode
 import time
+import pickle
 from dotenv import load_dotenv
+from src import mentions, migrate
 
 load_dotenv()
 
@@ -33,15 +35,18 @@ reddit = praw.Reddit(
 engine=create_engine(os.getenv("DATABASE_URL"), echo=True)
 
 # Title and body would be used for the sentiment analysis and for counting the number of times a particular ticker is mentioned 
-engine.execute("""CREATE TABLE IF NOT EXISTS reddit_data (
-                    date_time TIMESTAMP,
-                    subreddit VARCHAR(500),
-                    title VARCHAR(500),
-                    body VARCHAR(2000)
-                )""")
+# reddit_data HOLDS THE COMMENTS, mentions THE TICKERS EACH ONE MENTIONS (SEE migrations/)
+migrate.upgrade(engine)
 
-# pushing the data to the database 
-sqlFormula = "INSERT INTO reddit_data (date_time, subreddit, title, body) VALUES (%s, %s, %s, %s)"
+# TICKERS ARE MATCHED ONCE HERE, SO THE DASHBOARD NEVER SCANS COMMENT BODIES
+with open("tickers.pickle", "rb") as f:
+    mention_matcher = mentions.Matcher(pickle.load(f))
+
+# COMMENTS STORED BEFORE THE MENTIONS TABLE EXISTED (OR WHILE EXTRACTION WAS DOWN)
+mentions.backfill(engine, mention_matcher)
+
+# MINUTE AND HOUR BUZZ COUNTS ARE ONLY KEPT FOR A WHILE
+mentions.prune_rollups(engine)
 
 ## Streaming comments from reddit 
 while (datetime.time(8, 00, 0, 0, pytz.timezone('America/Chicago')) < datetime.datetime.now().time() and datetime.datetime.now().time() < datetime.time(22, 00, 0, 0, pytz.timezone('America/Chicago'))):
@@ -57,8 +62,8 @@ while (datetime.time(8, 00, 0, 0, pytz.timezone('America/Chicago')) < datetime.d
                     body = body
                 elif len(body) > 2000:
                     body = "data is too large" ## very rare situation - less than 0.1% of the cases have comment more than 2000 characters 
-                db=(current_time,subreddit,title,body)
-                engine.execute(sqlFormula, db)
+                # pushing the data to the database 
+                mentions.ingest(engine, current_time, subreddit, title, body, mention_matcher)
 
     # Keep an exception so that in case of error you dont hit the api multiple times and also your code wont crash on the vm
     except Exception as e:
@@ -0,0 +1,186 @@
+import os
+import time
+import threading
+from cachetools import TTLCache
+
+# WHILE UPSTREAM IS DOWN, TRY A BACKGROUND REFRESH OF THE SAME KEY AT MOST THIS OFTEN
+REVALIDATE_RETRY = int(os.getenv('CACHE_REVALIDATE_RETRY', 30))
+
+class CountingTTLCache(TTLCache):
+    '''
+    TTL + LRU CACHE THAT COUNTS HITS AND MISSES.
+    ENTRIES ARE (value, loaded_at) PAIRS THAT ARE FRESH FOR fresh_ttl SECONDS AND KEPT
+    AROUND AS STALE FALLBACKS UNTIL ttl EXPIRES THEM.
+    '''
+
+    def __init__(self, maxsize, ttl, getsizeof=None, name=None, fresh_ttl=None):
+        if getsizeof is not None:
+            value_size = getsizeof
+            getsizeof = lambda entry: value_size(entry[0])
+        super().__init__(maxsize, ttl, getsizeof=getsizeof)
+        self.name = name
+        self.fresh_ttl = fresh_ttl if fresh_ttl is not None else ttl
+        self.lock = threading.RLock()
+        self.revalidating = TTLCache(4096, REVALIDATE_RETRY)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def __getitem__(self, key):
+        try:
+            value = super().__getitem__(key)
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return value
+
+    def is_fresh(self, entry):
+        return time.time() - entry[1] < self.fresh_ttl
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': self.currsize,
+            'maxsize': self.maxsize,
+            'fresh_ttl': self.fresh_ttl,
+            'ttl': self.ttl,
+        }
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    '''
+    COLLAPSE CONCURRENT CALLS FOR THE SAME KEY INTO ONE IN-FLIGHT CALL
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        # FOLLOWERS WAIT FOR THE LEADER AND SHARE ITS RESULT (OR ITS ERROR)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+def _shared_key(cache, key):
+    parts = key if isinstance(key, tuple) else (key,)
+    return ':'.join(str(part) for part in (cache.name,) + parts)
+
+def _lookup(cache, key):
+    with cache.lock:
+        try:
+            return cache[key]
+        except KeyError:
+            return None
+
+def _store(cache, key, entry):
+    with cache.lock:
+        try:
+            cache[key] = entry
+        except ValueError:
+            pass # VALUE LARGER THAN THE WHOLE CACHE, SERVE IT UNCACHED
+
+def _load_entry(cache, key, load, shared, refresh):
+    if shared is None:
+        entry = (load(), time.time())
+    else:
+        shared_key = _shared_key(cache, key)
+        with shared.lock(shared_key):
+            # ANOTHER WORKER MAY HAVE FINISHED THE DOWNLOAD WHILE WE WAITED FOR THE LOCK
+            entry = None if refresh else shared.get(shared_key)
+            if entry is None or not cache.is_fresh(entry):
+                entry = (load(), time.time())
+                shared.set(shared_key, entry, cache.ttl)
+    _store(cache, key, entry)
+    return entry
+
+def _revalidate(cache, flight, key, load, shared):
+    # ONE BACKGROUND REFRESH PER KEY AT A TIME, RETRIED AT MOST EVERY REVALIDATE_RETRY SECONDS
+    with cache.lock:
+        if key in cache.revalidating or flight.in_flight(key):
+            return
+        cache.revalidating[key] = True
+
+    def run():
+        try:
+            flight.do(key, lambda: _load_entry(cache, key, load, shared, False))
+        except Exception as e:
+            with open('errors.txt', 'a') as f:
+                f.write('revalidate failed for %s: %s' % (_shared_key(cache, key), e))
+                f.write('\n')
+
+    threading.Thread(target=run, daemon=True).start()
+
+def get_or_load(cache, flight, key, load, shared=None, refresh=False):
+    '''
+    READ THROUGH A CountingTTLCache, THEN THE SHARED BACKEND, LOADING MISSES ONCE PER KEY
+    ACROSS THREADS (SingleFlight) AND ACROSS WORKERS (SHARED BACKEND LOCK).
+    RETURNS (value, stale). A STALE VALUE IS SERVED RIGHT AWAY WHILE A BACKGROUND THREAD
+    REFRESHES IT, SO AN UPSTREAM OUTAGE ONLY MEANS OLDER DATA.
+    refresh=True SKIPS THE READS AND RELOADS BOTH LEVELS (USED BY THE WARM-UP SCHEDULER).
+    '''
+    if not refresh:
+        entry = _lookup(cache, key)
+        if entry is None and shared is not None:
+            entry = shared.get(_shared_key(cache, key))
+            if entry is not None:
+                _store(cache, key, entry)
+        if entry is not None:
+            if cache.is_fresh(entry):
+                return entry[0], False
+            cache.stale_hits += 1
+            _revalidate(cache, flight, key, load, shared)
+            return entry[0], True
+
+    def load_entry():
+        # ANOTHER LEADER MAY HAVE FILLED THE CACHE BETWEEN OUR MISS AND NOW
+        if not refresh:
+            with cache.lock:
+                entry = cache.get(key)
+            if entry is not None and cache.is_fresh(entry):
+                return entry
+        return _load_entry(cache, key, load, shared, refresh)
+
+    return flight.do(key, load_entry)[0], False
+
+def frame_size(df):
+    '''
+    APPROXIMATE MEMORY FOOTPRINT OF A DATAFRAME IN BYTES
+    '''
+    return max(int(df.memory_usage(index=True).sum()), 1)
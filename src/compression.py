@@ -0,0 +1,114 @@
+"""
+Response compression for the Flask server behind Dash, so the layout (with the
+full ticker dropdown), the component bundles and the chart data go out
+compressed without a proxy in front of gunicorn.
+
+    br     when the client accepts it and the optional brotli package is installed
+    gzip   otherwise
+
+Responses under COMPRESS_MIN_SIZE bytes are sent as-is. Static files (assets,
+component bundles, the layout) are compressed once at the highest level and
+kept in memory; dynamic responses use a fast level. Every compressed body is
+cached by content hash, so repeat callback responses are not compressed twice.
+"""
+import os
+import gzip
+import hashlib
+import threading
+import flask
+from cachetools import LRUCache
+
+try:
+    import brotli # OPTIONAL DEPENDENCY, WITHOUT IT ONLY gzip IS OFFERED
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_CACHE_BYTES = int(os.getenv('COMPRESS_CACHE_BYTES', 32 * 1024 * 1024))
+
+COMPRESSIBLE_TYPES = (
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+)
+
+# THESE NEVER CHANGE WHILE THE PROCESS RUNS, SO THEY GET THE SLOW, SMALLEST ENCODING
+STATIC_PREFIXES = ('/assets/', '/_dash-component-suites/', '/_dash-layout', '/_dash-dependencies')
+
+# (FAST, STATIC) LEVELS PER ENCODING
+LEVELS = {'br': (5, 11), 'gzip': (6, 9)}
+
+_compressed = LRUCache(maxsize=COMPRESS_CACHE_BYTES, getsizeof=len)
+_compressed_lock = threading.Lock()
+stats = {'compressed': 0, 'cached': 0, 'bytes_in': 0, 'bytes_out': 0}
+
+def _encoding(accept_encoding):
+    if brotli is not None and 'br' in accept_encoding:
+        return 'br'
+    if 'gzip' in accept_encoding:
+        return 'gzip'
+    return None
+
+def _compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level)
+
+def compress_body(data, encoding, static=False):
+    '''
+    data COMPRESSED WITH encoding ('br' OR 'gzip'), FROM THE CACHE WHEN THE SAME BODY WAS SEEN BEFORE
+    '''
+    key = (hashlib.md5(data).digest(), encoding, static)
+    with _compressed_lock:
+        body = _compressed.get(key)
+    if body is not None:
+        stats['cached'] += 1
+        return body
+
+    body = _compress(data, encoding, LEVELS[encoding][static])
+    stats['compressed'] += 1
+    with _compressed_lock:
+        try:
+            _compressed[key] = body
+        except ValueError:
+            pass # LARGER THAN THE WHOLE CACHE
+    return body
+
+def _compress_response(response):
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+
+    encoding = _encoding(flask.request.headers.get('Accept-Encoding', ''))
+    if (encoding is None or response.status_code != 200
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    static = flask.request.path.startswith(STATIC_PREFIXES)
+    if response.direct_passthrough:
+        if not static:
+            return response
+        response.direct_passthrough = False # STATIC FILE, READ IT INTO MEMORY
+    elif response.is_streamed:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    body = compress_body(data, encoding, static)
+    stats['bytes_in'] += len(data)
+    stats['bytes_out'] += len(body)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+
+    # A WEAK ETAG STILL MATCHES THE ORIGINAL ONE IN If-None-Match, SO 304s KEEP WORKING
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_app(server):
+    '''
+    COMPRESS EVERY ELIGIBLE RESPONSE OF A FLASK APP (PASS dash.Dash(compress=False))
+    '''
+    server.after_request(_compress_response)
@@ -0,0 +1,152 @@
+"""
+Server-side downsampling of chart data to roughly one point per pixel. Line
+charts keep the points picked by Largest-Triangle-Three-Buckets on their main
+series (on all of them at once when one set of points serves every chart
+type); candles and OHLC bars are merged per bucket (first open, max high,
+min low, last close). When the user zooms, the visible window is sent at full
+resolution (or one point per pixel, whichever is smaller) while the rest of
+the history stays coarse, so the rangeslider still shows the whole range.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_WIDTH = 800
+
+# THE SERIES WHOSE SHAPE DECIDES WHICH POINTS A LINE CHART KEEPS
+MAIN_SERIES = {
+    "SMA": "close_10_sma",
+    "EMA": "close_10_ema",
+    "MACD": "macd",
+    "RSI": "rsi_6",
+}
+BAR_CHARTS = ("Candlestick", "OHLC")
+
+# A CANDLE NEEDS A FEW PIXELS TO BE READABLE
+PIXELS_PER_BAR = 3
+
+def lttb(x, y, threshold):
+    '''
+    INDICES OF THE threshold POINTS LARGEST-TRIANGLE-THREE-BUCKETS KEEPS (x AND y ARE FLOAT ARRAYS).
+    y MAY ALSO BE (len(x), k) FOR k SERIES SHARING x, THEIR TRIANGLE AREAS ARE ADDED UP
+    '''
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    y = y.reshape(n, -1)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # AVERAGE OF THE NEXT BUCKET (OR THE LAST POINT) IS THE THIRD CORNER OF THE TRIANGLE
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean(axis=0)
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end])[:, None] * (avg_y - y[a])
+        ).sum(axis=1)
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+def _aggregate_bars(df, buckets):
+    # ONE BAR PER BUCKET: FIRST OPEN, MAX HIGH, MIN LOW, LAST CLOSE, STAMPED WITH THE FIRST DATE
+    if buckets >= df.shape[0] or buckets < 1:
+        return df
+    groups = np.arange(df.shape[0]) * buckets // df.shape[0]
+    grouped = df.groupby(groups)
+    out = pd.DataFrame({
+        "Open": grouped["Open"].first().values,
+        "High": grouped["High"].max().values,
+        "Low": grouped["Low"].min().values,
+        "Close": grouped["Close"].last().values,
+    }, index=df.index[np.searchsorted(groups, np.arange(groups[-1] + 1))])
+    return out
+
+def _window(index, x_range):
+    if x_range is None:
+        return 0, len(index)
+    return index.searchsorted(x_range[0]), index.searchsorted(x_range[1], side="right")
+
+def _line_indices(df, y, x_range, width):
+    x = df.index.values.astype("datetime64[ns]").astype("int64").astype("float64")
+    valid = np.flatnonzero(~np.isnan(y.reshape(len(y), -1)).any(axis=1))
+    start, end = _window(df.index, x_range)
+
+    # COARSE BACKGROUND OVER THE WHOLE HISTORY
+    coarse = valid[lttb(x[valid], y[valid], width)]
+    if x_range is None:
+        return coarse
+
+    # FULL DETAIL INSIDE THE VISIBLE WINDOW, CAPPED AT ONE POINT PER PIXEL
+    inside = valid[(valid >= start) & (valid < end)]
+    inside = inside[lttb(x[inside], y[inside], width)]
+    outside = coarse[(coarse < start) | (coarse >= end)]
+    return np.union1d(outside, inside)
+
+def reduce(df, series, chart_name, x_range=None, width=None):
+    '''
+    (df, series) CUT DOWN TO ABOUT ONE POINT PER PIXEL OF A width-PIXEL CHART,
+    AT FULL DETAIL INSIDE x_range (A (start, end) PAIR OF TIMESTAMPS) IF GIVEN
+    '''
+    width = int(width or DEFAULT_WIDTH)
+    if df.shape[0] <= width:
+        return df, series
+
+    if chart_name in BAR_CHARTS:
+        buckets = max(width // PIXELS_PER_BAR, 1)
+        start, end = _window(df.index, x_range)
+        parts = [_aggregate_bars(df.iloc[:start], buckets * start // df.shape[0]),
+                 _aggregate_bars(df.iloc[start:end], buckets),
+                 _aggregate_bars(df.iloc[end:], buckets * (df.shape[0] - end) // df.shape[0])]
+        return pd.concat([part for part in parts if part.shape[0] > 0]), series
+
+    main = series[MAIN_SERIES[chart_name]] if chart_name in MAIN_SERIES else df["Close"].values
+    keep = _line_indices(df, np.asarray(main, dtype="float64"), x_range, width)
+    return df.iloc[keep], {name: values[keep] for name, values in series.items()}
+
+def x_range(relayout_data):
+    '''
+    VISIBLE (start, end) FROM A dcc.Graph relayoutData EVENT, None FOR A FULL VIEW,
+    False WHEN THE EVENT DID NOT TOUCH THE X AXIS
+    '''
+    if not relayout_data:
+        return False
+    if relayout_data.get("xaxis.autorange"):
+        return None
+    if "xaxis.range[0]" in relayout_data and "xaxis.range[1]" in relayout_data:
+        bounds = relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"]
+    elif "xaxis.range" in relayout_data:
+        bounds = relayout_data["xaxis.range"]
+    else:
+        return False
+    return pd.Timestamp(bounds[0]), pd.Timestamp(bounds[1])
+
+def _stacked(columns):
+    # (n, k) OF THE SERIES SCALED TO [0, 1], SO NO SERIES' UNITS OUTWEIGH THE OTHERS' IN THE
+    # TRIANGLE AREAS. WARM-UP NaNs ARE HELD AT THE NEAREST VALUE, A FLAT STRETCH ADDS NO AREA
+    out = []
+    for values in columns:
+        values = pd.Series(np.asarray(values, dtype="float64"))
+        lo, hi = values.min(), values.max()
+        if np.isnan(lo):
+            continue
+        scaled = (values - lo) / (hi - lo) if hi > lo else values * 0.0
+        out.append(scaled.ffill().bfill().values)
+    return np.column_stack(out)
+
+def reduce_all(df, series, x_range=None, width=None):
+    '''
+    ONE REDUCTION THAT SERVES EVERY CHART TYPE: (line_df, line_series, bars_df). THE LINE POINTS
+    ARE PICKED BY ONE LTTB PASS OVER THE CLOSE AND EVERY CHART'S MAIN SERIES TOGETHER, SO THERE
+    ARE STILL ABOUT width OF THEM. THE BARS ARE MERGED PER BUCKET LIKE reduce() DOES FOR CANDLES
+    '''
+    width = int(width or DEFAULT_WIDTH)
+    bars, _ = reduce(df, {}, "Candlestick", x_range, width)
+    if df.shape[0] <= width:
+        return df, series, bars
+
+    mains = [df["Close"].values] + [series[name] for name in MAIN_SERIES.values() if name in series]
+    keep = _line_indices(df, _stacked(mains), x_range, width)
+    return df.iloc[keep], {name: values[keep] for name, values in series.items()}, bars
@@ -0,0 +1,165 @@
+"""
+Figures and chart data for the dashboard. The layouts, axis template and the
+nine-button rangeselector are built once at import. Figures are returned as
+plain dicts, which dcc.Graph accepts as-is, so the hot path never runs
+plotly's graph_objs validation.
+
+The live stock chart does not ship figures: chart_data() packs the bars and
+every indicator into one payload for a dcc.Store, cached per (ticker, bars,
+view), and assets/charts.js builds the traces for the selected chart type in
+the browser with the layouts in CHART_LAYOUTS, so switching chart types never
+hits the server.
+
+Chart data stays in NumPy: x values are epoch milliseconds on a date axis and
+y values are rounded to PRICE_DECIMALS, so the encoder writes short numbers
+straight from ndarray.tolist() instead of boxing Timestamps and long floats.
+"""
+import os
+import threading
+import numpy as np
+from cachetools import LRUCache
+from src.downsample import reduce_all
+from src.indicators import CHART_SERIES, chart_series
+
+colors = {
+    "background": "#FFFFFF",
+    "text": "#000000"
+}
+
+RANGESELECTOR = {
+    "activecolor": "rgb(177,183,248)",
+    "bgcolor": colors["background"],
+    "buttons": [
+        {"count": 7, "label": "10D", "step": "day", "stepmode": "backward"},
+        {"count": 15, "label": "15D", "step": "day", "stepmode": "backward"},
+        {"count": 1, "label": "1m", "step": "month", "stepmode": "backward"},
+        {"count": 3, "label": "3m", "step": "month", "stepmode": "backward"},
+        {"count": 6, "label": "6m", "step": "month", "stepmode": "backward"},
+        {"count": 1, "label": "1y", "step": "year", "stepmode": "backward"},
+        {"count": 5, "label": "5y", "step": "year", "stepmode": "backward"},
+        {"count": 1, "label": "YTD", "step": "year", "stepmode": "todate"},
+        {"step": "all"},
+    ],
+}
+
+def _layout(margin):
+    return {
+        "showlegend": True,
+        "plot_bgcolor": colors["background"],
+        "paper_bgcolor": colors["background"],
+        "font": {"color": colors["text"]},
+        "margin": margin,
+        "xaxis": {
+            "type": "date", # X VALUES ARE EPOCH MILLISECONDS
+            "rangeslider": {"visible": True},
+            "rangeselector": RANGESELECTOR,
+        },
+    }
+
+# PRICE CHARTS AND INDICATOR CHARTS USE SLIGHTLY DIFFERENT MARGINS
+PRICE_LAYOUT = _layout({"l": 40, "r": 20, "t": 60, "b": 20})
+INDICATOR_LAYOUT = _layout({"l": 60, "r": 20, "t": 60, "b": 0})
+
+# SENT TO THE BROWSER ONCE WITH THE PAGE, charts.js PICKS THE LAYOUT FOR THE SELECTED CHART
+CHART_LAYOUTS = {
+    "Line": PRICE_LAYOUT,
+    "Candlestick": PRICE_LAYOUT,
+    "SMA": PRICE_LAYOUT,
+    "EMA": INDICATOR_LAYOUT,
+    "MACD": INDICATOR_LAYOUT,
+    "RSI": INDICATOR_LAYOUT,
+    "OHLC": PRICE_LAYOUT,
+}
+
+#-----------------------------------ENCODING-----------------------------------#
+
+# DECIMALS KEPT IN THE JSON, WELL BELOW A CENT AND BELOW WHAT THE HOVER LABELS SHOW
+PRICE_DECIMALS = int(os.getenv('PRICE_DECIMALS', 4))
+
+def _x(df):
+    # EPOCH MILLISECONDS, WHAT PLOTLY.JS USES INTERNALLY FOR DATE AXES
+    return df.index.values.astype("datetime64[ms]").astype("int64")
+
+def _y(values):
+    return np.round(np.asarray(values, dtype="float64"), PRICE_DECIMALS)
+
+#----------------------------------BUZZ CHART----------------------------------#
+
+BUZZ_LAYOUT = {
+    "showlegend": False,
+    "plot_bgcolor": colors["background"],
+    "paper_bgcolor": colors["background"],
+    "font": {"color": colors["text"]},
+    "margin": {"l": 40, "r": 20, "t": 20, "b": 30},
+    "height": 220,
+    "bargap": 0.1,
+    "xaxis": {"type": "date"},
+    "yaxis": {"title": "Mentions", "rangemode": "tozero"},
+}
+
+def buzz_figure(counts):
+    '''
+    MENTION VOLUME BAR CHART FROM A (bucket, mentions) ROLLUP FRAME
+    '''
+    return {
+        "data": [{
+            "type": "bar",
+            "x": _x(counts.set_index("bucket")),
+            "y": counts["mentions"].values,
+            "marker": {"color": RANGESELECTOR["activecolor"]},
+            "name": "Mentions",
+        }],
+        "layout": BUZZ_LAYOUT,
+    }
+
+#-------------------------------CHART DATA CACHE-------------------------------#
+
+_chart_data = LRUCache(maxsize=int(os.getenv('FIGURE_CACHE_SIZE', 256)))
+_chart_data_lock = threading.Lock()
+
+def _chart_data_key(ticker, df, x_range, width):
+    # THE LAST CLOSE IS PART OF THE KEY BECAUSE A STILL-TRADING BAR KEEPS ITS TIMESTAMP
+    if df.shape[0] == 0:
+        return (ticker,)
+    return (ticker, df.index[0], df.index[-1], df.shape[0], df['Close'].iloc[-1], x_range, width)
+
+def _all_series(ticker, df):
+    series = {}
+    for chart_name in CHART_SERIES:
+        series.update(chart_series(ticker, df, chart_name))
+    return series
+
+def chart_data(ticker, df, x_range=None, width=None, seed=None):
+    '''
+    BARS AND EVERY INDICATOR FOR THE CHART STORE, DOWNSAMPLED ONCE FOR ALL CHART TYPES.
+    WHEN df IS THE TAIL OF A LONGER FRAME seed, THE INDICATORS ARE COMPUTED OVER seed AND
+    CUT TO df, SO THEY ARE WARMED UP FROM df's FIRST BAR.
+    CACHED PER SET OF BARS AND VIEW. THE PAYLOAD IS SHARED, DO NOT MUTATE IT.
+    '''
+    key = _chart_data_key(ticker, df, x_range, width)
+    with _chart_data_lock:
+        payload = _chart_data.get(key)
+    if payload is not None:
+        return payload
+
+    if seed is None:
+        seed = df
+    start = seed.index.searchsorted(df.index[0])
+    series = {name: values[start:start + df.shape[0]] for name, values in _all_series(ticker, seed).items()}
+    line_df, series, bars = reduce_all(df, series, x_range, width)
+    line = {name: _y(values) for name, values in series.items()}
+    line["close"] = _y(line_df["Close"])
+    payload = {
+        "ticker": ticker,
+        "line": {"x": _x(line_df), "series": line},
+        "bars": {
+            "x": _x(bars),
+            "open": _y(bars["Open"]),
+            "high": _y(bars["High"]),
+            "low": _y(bars["Low"]),
+            "close": _y(bars["Close"]),
+        },
+    }
+    with _chart_data_lock:
+        _chart_data[key] = payload
+    return payload
@@ -0,0 +1,320 @@
+import os
+import copy
+import threading
+import numpy as np
+from collections import deque
+from cachetools import LRUCache
+
+# INDICATOR PARAMETERS DRAWN BY EACH CHART TYPE
+SMA_WINDOWS = (10, 15, 30, 100)
+EMA_SPANS = (10, 15, 30, 100)
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+RSI_WINDOWS = (6, 12)
+
+# PARAMETERS AND NAMES OF THE SERIES EACH CHART TYPE DRAWS
+CHART_PARAMS = {
+    'SMA': SMA_WINDOWS,
+    'EMA': EMA_SPANS,
+    'MACD': (MACD_FAST, MACD_SLOW, MACD_SIGNAL),
+    'RSI': RSI_WINDOWS,
+}
+CHART_SERIES = {
+    'SMA': ['close_%d_sma' % window for window in SMA_WINDOWS],
+    'EMA': ['close_%d_ema' % span for span in EMA_SPANS],
+    'MACD': ['macd', 'macds', 'macdh'],
+    'RSI': ['rsi_%d' % window for window in RSI_WINDOWS],
+}
+
+# LARGEST decay ** -k WE ALLOW INSIDE ONE BLOCK OF _decayed_cumsum
+_MAX_EXPONENT = 200.0
+_MAX_BLOCK = 256
+
+def _decayed_cumsum(x, decay):
+    '''
+    s[t] = decay * s[t-1] + x[t], VECTORIZED BLOCK BY BLOCK
+    '''
+    out = np.empty(len(x))
+    if decay <= 0.0:
+        out[:] = x
+        return out
+
+    # WITHIN A BLOCK s[k] = decay**k * (carry * decay + cumsum(x[j] * decay**-j)[k]),
+    # THE BLOCK SIZE KEEPS decay**-k FAR AWAY FROM OVERFLOW
+    block = int(min(_MAX_BLOCK, max(1, _MAX_EXPONENT / -np.log10(decay))))
+    powers = decay ** np.arange(block)
+    carry = 0.0
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        p = powers[:len(chunk)]
+        out[start:start + len(chunk)] = p * (carry * decay + np.cumsum(chunk / p))
+        carry = out[start + len(chunk) - 1]
+    return out
+
+def ewm_mean(values, alpha):
+    '''
+    SAME AS pandas .ewm(alpha=alpha, adjust=True, ignore_na=False, min_periods=0).mean()
+    '''
+    values = np.asarray(values, dtype='float64')
+    valid = ~np.isnan(values)
+    num = _decayed_cumsum(np.where(valid, values, 0.0), 1.0 - alpha)
+    den = _decayed_cumsum(valid.astype('float64'), 1.0 - alpha)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = num / den
+    out[den == 0] = np.nan
+    return out
+
+def ema(values, span):
+    return ewm_mean(values, 2.0 / (span + 1.0))
+
+def smma(values, window):
+    # WILDER'S SMOOTHING, AS USED BY RSI
+    return ewm_mean(values, 1.0 / window)
+
+def sma(values, window):
+    '''
+    SAME AS pandas .rolling(window).mean(), NaN UNTIL THE WINDOW IS FULL
+    '''
+    values = np.asarray(values, dtype='float64')
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums = np.cumsum(np.concatenate(([0.0], values)))
+        out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+def macd(close, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+    '''
+    (MACD LINE, SIGNAL LINE, HISTOGRAM) WITH stockstats' DEFINITIONS
+    '''
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+def rsi(close, window):
+    '''
+    RSI OVER WILDER-SMOOTHED GAINS AND LOSSES, SAME AS stockstats' rsi_N
+    '''
+    close = np.asarray(close, dtype='float64')
+    change = np.empty(len(close))
+    change[:1] = np.nan
+    change[1:] = np.diff(close)
+    gains = smma((change + np.abs(change)) / 2, window)
+    losses = smma((np.abs(change) - change) / 2, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100.0 - 100.0 / (1.0 + gains / losses)
+
+def for_chart(close, chart_name):
+    '''
+    ONLY THE INDICATOR SERIES THE SELECTED CHART DRAWS, KEYED WITH stockstats-STYLE NAMES
+    '''
+    if chart_name == 'SMA':
+        return {'close_%d_sma' % window: sma(close, window) for window in SMA_WINDOWS}
+    if chart_name == 'EMA':
+        return {'close_%d_ema' % span: ema(close, span) for span in EMA_SPANS}
+    if chart_name == 'MACD':
+        line, signal_line, histogram = macd(close)
+        return {'macd': line, 'macds': signal_line, 'macdh': histogram}
+    if chart_name == 'RSI':
+        return {'rsi_%d' % window: rsi(close, window) for window in RSI_WINDOWS}
+    return {}
+
+
+#------------------------INCREMENTAL PER-TICKER STATE--------------------------#
+
+class _Ewm:
+    # ADJUSTED EWM KEPT AS (DECAYED SUM OF VALUES, DECAYED COUNT), SAME RESULT AS ewm_mean
+
+    def __init__(self, alpha, num=0.0, den=0.0):
+        self.decay = 1.0 - alpha
+        self.num = num
+        self.den = den
+
+    def update(self, value):
+        self.num *= self.decay
+        self.den *= self.decay
+        if not np.isnan(value):
+            self.num += value
+            self.den += 1.0
+        return self.num / self.den if self.den else np.nan
+
+def _ewm_state(values, alpha):
+    # RESUMABLE _Ewm AFTER THE LAST OF values
+    values = np.asarray(values, dtype='float64')
+    valid = ~np.isnan(values)
+    num = _decayed_cumsum(np.where(valid, values, 0.0), 1.0 - alpha)
+    den = _decayed_cumsum(valid.astype('float64'), 1.0 - alpha)
+    return _Ewm(alpha, num[-1], den[-1])
+
+class _Rolling:
+    # THE LAST N VALUES AND THEIR RUNNING SUM
+
+    def __init__(self, window, values):
+        self.window = window
+        self.values = deque(values, maxlen=window)
+        self.total = float(np.sum(self.values))
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+        return self.total / self.window if len(self.values) == self.window else np.nan
+
+class _Buffer:
+    # GROWABLE FLOAT ARRAY WITH AMORTIZED O(1) APPEND
+
+    def __init__(self, values):
+        self.size = len(values)
+        self.data = np.empty(max(2 * self.size, 64))
+        self.data[:self.size] = values
+
+    def append(self, value):
+        if self.size == len(self.data):
+            self.data = np.concatenate((self.data, np.empty(len(self.data))))
+        self.data[self.size] = value
+        self.size += 1
+
+    def set_last(self, value):
+        self.data[self.size - 1] = value
+
+    def view(self):
+        return self.data[:self.size]
+
+class IndicatorState:
+    '''
+    EVERY INDICATOR SERIES FOR ONE TICKER PLUS THE SCALARS NEEDED TO EXTEND THEM, SO A NEW
+    OR REVISED BAR COSTS O(1) INSTEAD OF ANOTHER PASS OVER THE WHOLE HISTORY
+    '''
+
+    def __init__(self, dates, close):
+        close = np.asarray(close, dtype='float64')
+        self.lock = threading.Lock()
+        self.first_date = dates[0]
+        self.last_date = dates[-1]
+
+        series = {'close': close}
+        for chart_name in CHART_SERIES:
+            series.update(for_chart(close, chart_name))
+        self.series = {name: _Buffer(values) for name, values in series.items()}
+
+        gains = np.concatenate(([np.nan], np.maximum(np.diff(close), 0.0)))
+        losses = np.concatenate(([np.nan], np.maximum(-np.diff(close), 0.0)))
+        self.smas = {w: _Rolling(w, close[-w:]) for w in SMA_WINDOWS}
+        self.emas = {s: _ewm_state(close, 2.0 / (s + 1.0)) for s in set(EMA_SPANS) | {MACD_FAST, MACD_SLOW}}
+        self.macd_signal = _ewm_state(series['macd'], 2.0 / (MACD_SIGNAL + 1.0))
+        self.gains = {w: _ewm_state(gains, 1.0 / w) for w in RSI_WINDOWS}
+        self.losses = {w: _ewm_state(losses, 1.0 / w) for w in RSI_WINDOWS}
+
+        # SCALARS AS THEY WERE BEFORE THE NEWEST BAR, SO A REVISED (STILL TRADING) BAR CAN BE REPLAYED
+        self._before_last = None
+
+    @property
+    def size(self):
+        return self.series['close'].size
+
+    def _scalars(self):
+        return copy.deepcopy((self.smas, self.emas, self.macd_signal, self.gains, self.losses))
+
+    def _step(self, close, prev_close):
+        change = close - prev_close
+        values = {'close': close}
+        for w, rolling in self.smas.items():
+            values['close_%d_sma' % w] = rolling.update(close)
+        emas = {s: ewm.update(close) for s, ewm in self.emas.items()}
+        for s in EMA_SPANS:
+            values['close_%d_ema' % s] = emas[s]
+        values['macd'] = emas[MACD_FAST] - emas[MACD_SLOW]
+        values['macds'] = self.macd_signal.update(values['macd'])
+        values['macdh'] = values['macd'] - values['macds']
+        for w in RSI_WINDOWS:
+            gain = self.gains[w].update(max(change, 0.0))
+            loss = self.losses[w].update(max(-change, 0.0))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values['rsi_%d' % w] = 100.0 - 100.0 / (1.0 + np.float64(gain) / loss)
+        return values
+
+    def append(self, date, close):
+        self._before_last = self._scalars()
+        for name, value in self._step(close, self.series['close'].view()[-1]).items():
+            self.series[name].append(value)
+        self.last_date = date
+
+    def replace_last(self, close):
+        self.smas, self.emas, self.macd_signal, self.gains, self.losses = copy.deepcopy(self._before_last)
+        for name, value in self._step(close, self.series['close'].view()[-2]).items():
+            self.series[name].set_last(value)
+
+    def sync(self, dates, close):
+        '''
+        FOLD NEW OR REVISED BARS INTO THE STATE. RETURNS WHERE dates[0] SITS IN THE SERIES,
+        OR None WHEN THE STATE CANNOT BE EXTENDED AND HAS TO BE REBUILT
+        '''
+        pos = dates.searchsorted(self.last_date)
+        offset = self.size - 1 - pos
+        if pos >= len(dates) or dates[pos] != self.last_date or offset < 0:
+            return None
+
+        # AN OLDER BAR CHANGED: THE HISTORY WAS RE-ADJUSTED FOR A SPLIT OR DIVIDEND
+        stored_close = self.series['close'].view()
+        if pos > 0 and close[pos - 1] != stored_close[-2]:
+            return None
+
+        if close[pos] != stored_close[-1]:
+            if self._before_last is None:
+                return None
+            self.replace_last(close[pos])
+        for i in range(pos + 1, len(dates)):
+            self.append(dates[i], close[i])
+        return offset
+
+# ONE STATE PER (TICKER, FIRST BAR): THE EMAs ARE SEEDED AT THE FIRST BAR, SO A STATE IS ONLY
+# EXTENDED FOR FRAMES THAT START WHERE IT DOES. THE LEAST RECENTLY VIEWED ARE DROPPED FIRST
+_states = LRUCache(maxsize=512)
+_states_lock = threading.Lock()
+
+# FINISHED RESULTS, KEYED BY TICKER, THE BARS THEY COVER AND THE INDICATOR PARAMETERS
+_results = LRUCache(maxsize=int(os.getenv('INDICATOR_CACHE_SIZE', 2048)))
+_results_lock = threading.Lock()
+result_stats = {'hits': 0, 'misses': 0}
+
+def _compute_series(ticker, dates, close, names):
+    key = (ticker, dates[0])
+    with _states_lock:
+        state = _states.get(key)
+    if state is not None:
+        with state.lock:
+            offset = state.sync(dates, close)
+            if offset is not None:
+                return {name: state.series[name].view()[offset:offset + len(dates)].copy() for name in names}
+
+    state = IndicatorState(dates, close)
+    with _states_lock:
+        _states[key] = state
+    return {name: state.series[name].view().copy() for name in names}
+
+def chart_series(ticker, df, chart_name):
+    '''
+    INDICATOR SERIES FOR chart_name ALIGNED WITH df (A yfinance HISTORY FRAME). REPEAT VIEWS OF
+    THE SAME BARS ARE SERVED FROM A MEMO, OTHERWISE THE TICKER'S CACHED STATE IS EXTENDED WITH
+    ANY NEW BARS INSTEAD OF RECOMPUTING THE WHOLE HISTORY. THE RETURNED ARRAYS ARE READ-ONLY.
+    THE EMAs ARE SEEDED AT df's FIRST BAR, SO PASS THE VIEW WITH A LOOKBACK IN FRONT OF IT.
+    '''
+    names = CHART_SERIES.get(chart_name, [])
+    if not names or df.shape[0] == 0:
+        return {}
+    dates, close = df.index, df['Close'].values
+
+    # THE LAST CLOSE IS PART OF THE KEY BECAUSE A STILL-TRADING BAR KEEPS ITS TIMESTAMP
+    key = (ticker, dates[0], dates[-1], len(dates), close[-1], chart_name, CHART_PARAMS[chart_name])
+    with _results_lock:
+        series = _results.get(key)
+    if series is not None:
+        result_stats['hits'] += 1
+        return series
+    result_stats['misses'] += 1
+
+    series = _compute_series(ticker, dates, close, names)
+    for values in series.values():
+        values.flags.writeable = False
+    with _results_lock:
+        _results[key] = series
+    return series
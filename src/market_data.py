@@ -0,0 +1,121 @@
+import os
+import yfinance
+import pandas as pd
+from datetime import datetime
+from src import ohlcv_store
+from src.shared_cache import get_backend
+from src.cache import CountingTTLCache, SingleFlight, get_or_load, frame_size
+
+# HISTORY GOES STALE QUICKLY DURING MARKET HOURS, FUNDAMENTALS BARELY MOVE
+HISTORY_TTL = int(os.getenv('HISTORY_CACHE_TTL', 300))
+INFO_TTL = int(os.getenv('INFO_CACHE_TTL', 6 * 60 * 60))
+
+# PAST THEIR TTL, ENTRIES ARE STILL SERVED (AND REFRESHED IN THE BACKGROUND) FOR THIS LONG
+HISTORY_STALE_TTL = int(os.getenv('HISTORY_STALE_TTL', 3 * 24 * 60 * 60))
+INFO_STALE_TTL = int(os.getenv('INFO_STALE_TTL', 7 * 24 * 60 * 60))
+
+# THE CHART PAINTS THE LAST YEAR FIRST AND DOWNLOADS THE FULL HISTORY ON DEMAND
+FIRST_PAINT_PERIOD = os.getenv('FIRST_PAINT_PERIOD', '1y')
+FULL_PERIOD = '5y'
+
+# THE FIRST PAINT'S INDICATORS ARE ALWAYS SEEDED THIS MANY BARS BEFORE ITS FIRST BAR (SMA-100
+# NEEDS 99, THE WEIGHT LEFT ON AN EMA-100 SEED IS UNDER 1%), SO THEY DO NOT DEPEND ON WHAT ELSE IS
+# CACHED. FIRST_PAINT_HISTORY IS THE ONE DOWNLOAD THAT COVERS THE PAINTED BARS AND THE LOOKBACK,
+# THE HEADER AND STATS TABLE READ THE SAME FRAME
+INDICATOR_LOOKBACK = int(os.getenv('INDICATOR_LOOKBACK', 250))
+FIRST_PAINT_HISTORY = os.getenv('FIRST_PAINT_HISTORY', '2y')
+
+# HISTORY IS BOUNDED BY BYTES, INFO DICTS BY NUMBER OF TICKERS
+HISTORY_CACHE_BYTES = int(os.getenv('HISTORY_CACHE_BYTES', 64 * 1024 * 1024))
+INFO_CACHE_SIZE = int(os.getenv('INFO_CACHE_SIZE', 1024))
+
+history_cache = CountingTTLCache(HISTORY_CACHE_BYTES, HISTORY_STALE_TTL, getsizeof=frame_size,
+                                 name='history', fresh_ttl=HISTORY_TTL)
+info_cache = CountingTTLCache(INFO_CACHE_SIZE, INFO_STALE_TTL, name='info', fresh_ttl=INFO_TTL)
+
+# SECOND LEVEL SHARED BY ALL WORKERS ON THE HOST (SEE src/shared_cache.py)
+shared_cache = get_backend()
+
+# CONCURRENT MISSES FOR THE SAME KEY SHARE ONE UPSTREAM DOWNLOAD
+history_flight = SingleFlight()
+info_flight = SingleFlight()
+
+def fetch_history(ticker, period='5y', refresh=False):
+    '''
+    (DAILY BARS, STALE) FOR A TICKER. A MISS READS THE ON-DISK STORE AND ONLY DOWNLOADS
+    THE BARS IT IS MISSING. THE RETURNED FRAME IS SHARED, COPY IT BEFORE MUTATING.
+    '''
+    key = (ticker, period)
+    return get_or_load(history_cache, history_flight, key,
+                       lambda: ohlcv_store.load(ticker, period), shared=shared_cache, refresh=refresh)
+
+def first_paint_history(ticker):
+    '''
+    (PAINTED BARS, SEED BARS, STALE): THE LAST FIRST_PAINT_PERIOD OF BARS, AND THE SAME BARS WITH
+    INDICATOR_LOOKBACK MORE IN FRONT TO COMPUTE THEIR INDICATORS FROM
+    '''
+    history, stale = fetch_history(ticker, period=FIRST_PAINT_HISTORY)
+    painted = ohlcv_store.trim(history, FIRST_PAINT_PERIOD)
+    start = max(history.shape[0] - painted.shape[0] - INDICATOR_LOOKBACK, 0)
+    return painted, history.iloc[start:], stale
+
+def fetch_info(ticker, refresh=False):
+    '''
+    (COMPANY INFO DICT, STALE) FOR A TICKER (SHARED, DO NOT MUTATE)
+    '''
+    return get_or_load(info_cache, info_flight, ticker,
+                       lambda: yfinance.Ticker(ticker).info, shared=shared_cache, refresh=refresh)
+
+def cache_stats():
+    history, info = history_cache.stats(), info_cache.stats()
+    history['coalesced'] = history_flight.shared
+    info['coalesced'] = info_flight.shared
+    stats = {'history': history, 'info': info}
+    if shared_cache is not None:
+        stats['shared'] = shared_cache.stats()
+    return stats
+
+def get_market_bundle(ticker):
+    '''
+    FETCH THE LAST YEAR OF HISTORY AND COMPANY INFO ONCE AND DERIVE EVERYTHING ELSE
+    (THE HEADER AND STATS TABLE NEVER LOOK FURTHER BACK THAN ONE YEAR)
+    '''
+
+    # THE SAME CACHE ENTRY (AND DOWNLOAD) AS THE CHART'S FIRST PAINT
+    history, stale = fetch_history(ticker, period=FIRST_PAINT_HISTORY)
+
+    # CATCH IF STOCK EXISTS (SAME CHECK AS period='ytd', WITHOUT THE EXTRA CALL)
+    year_start = pd.Timestamp(datetime.now().year, 1, 1)
+    has_ytd = bool((history.index >= year_start).any())
+
+    bundle = {
+        'ticker': ticker,
+        'history': history,
+        'has_ytd': has_ytd,
+        'info': None,
+        'one_year': None,
+        'last_close': None,
+        'prev_close': None,
+        'stale': stale,
+    }
+
+    if not has_ytd:
+        return bundle
+
+    # ONE YEAR SLICE (SAME WINDOW AS period='1y') FOR THE PRICE HEADER AND STATS TABLE
+    one_year_start = pd.Timestamp(datetime.now().date()) - pd.DateOffset(years=1)
+    one_year = history[history.index >= one_year_start]
+
+    # INFO IS LEFT AS None ON FAILURE SO THE CALLER CAN SHOW ITS OWN ERROR STATE
+    try:
+        bundle['info'], info_stale = fetch_info(ticker)
+        bundle['stale'] = stale or info_stale
+    except Exception:
+        bundle['info'] = None
+
+    bundle['one_year'] = one_year
+    if one_year.shape[0] >= 2:
+        bundle['last_close'] = one_year['Close'].iloc[-1]
+        bundle['prev_close'] = one_year['Close'].iloc[-2]
+
+    return bundle
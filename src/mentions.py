@@ -0,0 +1,401 @@
+"""
+Ticker mentions, extracted once when a comment is ingested instead of being
+searched for with LIKE scans on every feed request. Every comment that mentions
+a ticker gets a row in mentions(comment_id, ticker, ts), and the feed reads the
+newest rows for a ticker with an index range scan on (ticker, ts DESC). The
+tables are created by migrations/ (src/migrate.py).
+
+Comments are deduplicated on write: reddit_data has a unique MD5 of the body,
+and a repost of a body already stored moves the existing row (and its
+mentions) to the repost's time instead of adding a copy.
+
+Mention volume is rolled up as it is ingested: every mention (reposts
+included, they are buzz too) increments its ticker's per-minute, per-hour and
+per-day counters, which is all the buzz chart reads.
+
+A comment mentions a ticker when it contains, as a whole word, its cashtag
+($DIS or $dis), its bare symbol (DIS, upper case, three letters or more and
+not a common word), the company alias from tickers.pickle (Disney), or its
+full company name when the alias is an everyday word or is shared by several
+tickers (Best Buy, General Electric). All the
+needles are compiled into one Aho-Corasick automaton, so a comment is matched
+in a single pass whatever the number of tickers. The C automaton from the
+optional pyahocorasick package is used when installed, otherwise a pure Python
+one (benchmarks/mentions_bench.py compares them).
+
+Free-text search over comment titles and bodies is the only query that reads
+the pg_trgm indexes, and it only runs when the user types a search.
+"""
+import hashlib
+import re
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+try:
+    import ahocorasick # OPTIONAL DEPENDENCY, ABOUT 4x FASTER THAN THE PURE PYTHON AUTOMATON
+except ImportError:
+    ahocorasick = None
+
+UPSERT_COMMENT = text(
+    "INSERT INTO reddit_data (date_time, subreddit, title, body, body_hash) "
+    "VALUES (:date_time, :subreddit, :title, :body, :body_hash) "
+    "ON CONFLICT (body_hash) DO UPDATE SET "
+    "date_time = EXCLUDED.date_time, subreddit = EXCLUDED.subreddit, title = EXCLUDED.title "
+    "RETURNING id"
+)
+UPSERT_MENTION = text(
+    "INSERT INTO mentions (comment_id, ticker, ts) VALUES (:comment_id, :ticker, :ts) "
+    "ON CONFLICT (comment_id, ticker) DO UPDATE SET ts = EXCLUDED.ts"
+)
+
+# TRIGRAM INDEXES CANNOT ANSWER SEARCHES SHORTER THAN ONE TRIGRAM
+TRIGRAM_MIN = 3
+
+# ROLLUP GRANULARITY -> HOW LONG ITS BUCKETS ARE KEPT
+ROLLUPS = {
+    'minute': timedelta(days=7),
+    'hour': timedelta(days=90),
+    'day': timedelta(days=10 * 365),
+}
+
+# ROLLUP GRANULARITY -> HOW FAR BACK THE BUZZ CHART LOOKS
+BUZZ_WINDOWS = {
+    'minute': timedelta(days=1),
+    'hour': timedelta(days=7),
+    'day': timedelta(days=365),
+}
+
+# ONE STATEMENT PER ROLLUP TABLE, date_trunc IN SQL SO THE BUCKETS MATCH migrations/0005
+UPSERT_ROLLUPS = [text(
+    "INSERT INTO mention_counts_%s (ticker, bucket, mentions) "
+    "VALUES (:ticker, date_trunc('%s', CAST(:ts AS TIMESTAMP)), 1) "
+    "ON CONFLICT (ticker, bucket) DO UPDATE SET mentions = mention_counts_%s.mentions + 1"
+    % (granularity, granularity, granularity)
+) for granularity in ROLLUPS]
+
+# THE BUZZ CHART: A PRIMARY KEY RANGE SCAN ON ONE ROLLUP TABLE. BUCKETS ARE STAMPED WITH THE
+# STREAMER'S NAIVE LOCAL TIME (reddit_stream.py), NOT THE DATABASE'S CLOCK, SO THIS CUTOFF AND
+# prune_rollups()'s ARE COMPUTED IN PYTHON FROM THE SAME CLOCK RATHER THAN WITH LOCALTIMESTAMP
+BUZZ_QUERY = """SELECT bucket, mentions FROM mention_counts_%s
+    WHERE ticker = %%(ticker)s AND bucket >= %%(since)s
+    ORDER BY bucket;"""
+
+# COMMENTS PER FEED PAGE
+FEED_PAGE = 20
+
+# EXTRACTED MENTIONS ONLY, AN INDEX RANGE SCAN ON mentions THAT COSTS THE SAME HOWEVER MANY COMMENTS
+# ARE STORED. PAGES ARE KEYSET CURSORS ON (date_time, id), SO A DEEP PAGE IS AS CHEAP AS THE FIRST
+# (mentions.ts IS KEPT EQUAL TO reddit_data.date_time BY ingest)
+FEED_QUERY = """SELECT r.id, r.subreddit, r.date_time, r.body
+    FROM mentions m JOIN reddit_data r ON r.id = m.comment_id
+    WHERE m.ticker = %(ticker)s
+      AND (%(before_ts)s IS NULL OR (m.ts, m.comment_id) < (%(before_ts)s, %(before_id)s))
+    ORDER BY m.ts DESC, m.comment_id DESC LIMIT %(limit)s;"""
+
+# FREE-TEXT SEARCH OVER TITLES AND BODIES (pg_trgm INDEXES), ONLY WHEN THE USER TYPES ONE. IT ALSO
+# FINDS ALIASES ADDED TO tickers.pickle AFTER THE COMMENTS WERE INGESTED. SAME KEYSET PAGES AS THE FEED
+SEARCH_QUERY = """SELECT id, subreddit, date_time, body FROM reddit_data
+    WHERE (body ILIKE %(pattern)s OR title ILIKE %(pattern)s) AND date_time IS NOT NULL
+      AND (%(before_ts)s IS NULL OR (date_time, id) < (%(before_ts)s, %(before_id)s))
+    ORDER BY date_time DESC, id DESC LIMIT %(limit)s;"""
+
+def like_pattern(term):
+    '''
+    %term% WITH LIKE WILDCARDS IN term ESCAPED
+    '''
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def search_term(value):
+    '''
+    value STRIPPED, OR None WHEN IT IS TOO SHORT FOR THE TRIGRAM INDEXES
+    '''
+    value = (value or '').strip()
+    return value if len(value) >= TRIGRAM_MIN else None
+
+def feed_query(ticker, search=None, cursor=None, limit=FEED_PAGE):
+    '''
+    (SQL, PARAMS) FOR ONE FEED PAGE: THE COMMENTS MENTIONING ticker, OR THE ONES MATCHING search
+    WHEN IT IS GIVEN (SEE search_term). cursor IS THE [date_time, id] OF THE LAST COMMENT ON THE
+    PREVIOUS PAGE (None FOR THE FIRST PAGE)
+    '''
+    before_ts, before_id = cursor if cursor else (None, None)
+    params = {'before_ts': before_ts, 'before_id': before_id, 'limit': limit}
+    if search:
+        params['pattern'] = like_pattern(search)
+        return SEARCH_QUERY, params
+    params['ticker'] = ticker
+    return FEED_QUERY, params
+
+def next_cursor(page, limit=FEED_PAGE):
+    '''
+    CURSOR FOR THE PAGE AFTER page (A feed_query RESULT FRAME), None WHEN IT WAS THE LAST ONE
+    '''
+    if page.shape[0] < limit:
+        return None
+    last = page.iloc[-1]
+    return [last['date_time'].isoformat(), int(last['id'])]
+
+BACKFILL_BATCH = 1000
+
+# BARE SYMBOLS SHORTER THAN THIS, OR SPELLING ONE OF THESE, ARE ONLY MATCHED AS CASHTAGS. THE
+# LIST HOLDS EVERY SYMBOL IN tickers.pickle THAT IS ALSO AN EVERYDAY WORD OR ABBREVIATION, PLUS
+# REDDIT AND TRADING JARGON WRITTEN IN CAPITALS. CHECK NEW SYMBOLS AGAINST IT WHEN tickers.pickle
+# IS REBUILT
+BARE_SYMBOL_MIN = 3
+COMMON_WORDS = {
+    'ADS', 'ALE', 'ALL', 'ALLY', 'AMA', 'AMP', 'AND', 'ANY', 'APE', 'APES', 'APPS', 'ARE', 'ASH',
+    'ATH', 'ATM', 'BAH', 'BAM', 'BAND', 'BEAM', 'BEAR', 'BIG', 'BIO', 'BLUE', 'BOX', 'BRO', 'BULL',
+    'BUY', 'CAKE', 'CALL', 'CALLS', 'CAN', 'CAR', 'CAT', 'CENT', 'CEO', 'CERT', 'CFO', 'COG',
+    'COKE', 'COLD', 'CONE', 'COOP', 'COP', 'COST', 'COUP', 'CPI', 'CTO', 'CUB', 'CUBE', 'CUZ',
+    'DAY', 'DECK', 'DISH', 'DOC', 'DOOR', 'DORM', 'EAR', 'EAT', 'EDIT', 'EOD', 'EOW', 'EPS', 'ETA',
+    'ETF', 'EXP', 'EXPO', 'EYE', 'FANG', 'FAST', 'FATE', 'FED', 'FIVE', 'FIX', 'FLOW', 'FOLD',
+    'FOMO', 'FOR', 'FORM', 'FOUR', 'FOX', 'FROG', 'FUD', 'FUN', 'FYI', 'GAIN', 'GDP', 'GOLD',
+    'GOLF', 'GPS', 'HALO', 'HAS', 'HODL', 'HOG', 'HOLD', 'HUBS', 'HUM', 'HUN', 'ICE', 'IMHO', 'IMO',
+    'IONS', 'IPO', 'IRS', 'ITM', 'JACK', 'KEY', 'KEYS', 'LAD', 'LEG', 'LITE', 'LMAO', 'LOL', 'LONG',
+    'LOSS', 'LOVE', 'LOW', 'LUV', 'MAIN', 'MAN', 'MAT', 'MED', 'MET', 'MIC', 'MOON', 'MORN', 'MSM',
+    'NAV', 'NET', 'NEW', 'NOW', 'NSFW', 'OMG', 'ONE', 'ONTO', 'OPEN', 'OTM', 'OUT', 'PCT', 'PEAK',
+    'PEG', 'PEP', 'PLAN', 'PLAY', 'PLUG', 'POOL', 'POSH', 'POST', 'PPL', 'PSA', 'PUT', 'PUTS',
+    'RAMP', 'RARE', 'REAL', 'RIDE', 'RIOT', 'ROCK', 'ROI', 'ROLL', 'ROOT', 'RPM', 'RUN', 'SAFE',
+    'SAGE', 'SAIL', 'SAVE', 'SEAS', 'SEC', 'SEE', 'SEER', 'SELL', 'SHOP', 'SHORT', 'SITE', 'SIX',
+    'SKY', 'SLAB', 'SNAP', 'SNOW', 'SON', 'SSD', 'STAG', 'STAY', 'SUM', 'SUN', 'TAP', 'TECH', 'THC',
+    'THE', 'THO', 'TIL', 'TLDR', 'TOWN', 'TREE', 'TRIP', 'TWO', 'TXT', 'UNIT', 'USA', 'USB', 'USD',
+    'WAT', 'WELL', 'WEN', 'WING', 'WISH', 'WOOF', 'WSB', 'WTF', 'WWW', 'YOLO', 'YOU', 'YUM',
+}
+ALIAS_MIN = 2
+
+# ALIASES THAT ARE EVERYDAY WORDS, FIRST NAMES, SURNAMES OR PLACES ("Target", "Best", "Henry",
+# "Alaska"), WHICH WOULD TAG EVERY SENTENCE STARTING WITH THEM. THE LIST HOLDS EVERY ALIAS IN
+# tickers.pickle USED BY ONE TICKER ONLY THAT IS COMMON IN ENGLISH TEXT, EXCEPT THE BRANDS THAT
+# OWN THE WORD (Disney, Tesla, Boeing). ALIASES SHARED BY SEVERAL TICKERS ("American", "First",
+# "Bank") ARE DROPPED WITHOUT BEING LISTED. A TICKER WHOSE ALIAS IS DROPPED IS MATCHED ON ITS
+# COMPANY NAME INSTEAD ("Best Buy", "General Electric") WHEN THAT IS TWO WORDS OR MORE
+COMMON_ALIASES = {
+    '3D', 'Abbott', 'Academy', 'Accolade', 'Acuity', 'Adams', 'Adaptive', 'Advance', 'Advantage',
+    'Affiliated', 'Affirm', 'Agree', 'Alaska', 'Albany', 'Alexandria', 'Align', 'Alignment',
+    'Allegheny', 'Allegro', 'Alliance', 'Allison', 'Ally', 'Amicus', 'Analog', 'Anthem', 'APA',
+    'Apollo', 'Arbor', 'Arena', 'Ares', 'Armstrong', 'Array', 'Arrow', 'Arrowhead', 'Arthur',
+    'Artisan', 'Ashland', 'Aspen', 'Associated', 'Atlantic', 'Atmos', 'Automatic', 'Avery',
+    'Badger', 'Ball', 'Ballard', 'Banco', 'Bandwidth', 'Barnes', 'Baxter', 'Beacon', 'Beam', 'Bed',
+    'Bentley', 'Berkeley', 'Berry', 'Best', 'Beyond', 'Big', 'Black', 'Blueprint', 'Boise',
+    'Booking', 'Box', 'Boyd', 'Brady', 'Bright', 'Brooks', 'Brown', 'Brunswick', 'Builders',
+    'Cable', 'California', 'Camden', 'Campbell', 'Camping', 'Canopy', 'Capital', 'Cardinal',
+    'Carlisle', 'Carpenter', 'Cedar', 'Celsius', 'Century', 'CF', 'CGI', 'Change', 'Chart',
+    'Charter', 'Cheesecake', 'Chimera', 'Choice', 'Church', 'Cincinnati', 'Cirrus', 'Citizens',
+    'Clover', 'CMC', 'CMS', 'Coca', 'Cogent', 'Coherent', 'Colony', 'Comfort', 'Commerce',
+    'Commercial', 'Community', 'Compass', 'Consolidated', 'Constellation', 'Continental', 'Cooper',
+    'Cornerstone', 'Corporate', 'Corsair', 'Cousins', 'Cracker', 'Crane', 'Credit', 'Crescent',
+    'Cubic', 'D/B/A', 'Dana', 'Darling', 'Dave', 'Delta', 'Denali', 'Descartes', 'Devon', 'Diodes',
+    'Discover', 'Dominion', 'Donaldson', 'Douglas', 'Dover', 'Dream', 'Driven', 'Duck', 'Dun',
+    'Eagle', 'East', 'Eastern', 'Eastman', 'Eaton', 'Edison', 'Edwards', 'Elastic', 'Electronic',
+    'Element', 'Eli', 'Emergent', 'Emerson', 'Empire', 'Encompass', 'Energy', 'Enterprise',
+    'Equitable', 'Erie', 'Essex', 'Exact', 'eXp', 'Exponent', 'Extended', 'Extra', 'Fair', 'Fate',
+    'FB', 'Federated', 'Fidelity', 'Fifth', 'FIRST', 'Five', 'Flowers', 'Focus', 'Foot', 'Ford',
+    'Fortress', 'Fortune', 'Forward', 'Four', 'Frontier', 'Fulton', 'Gaming', 'Gap', 'Genuine',
+    'Gibraltar', 'Glacier', 'Globe', 'Graham', 'Grand', 'Graphic', 'Green', 'Grocery', 'Group',
+    'H&R', 'H.', 'Hamilton', 'Hancock', 'Hanover', 'Hartford', 'Hawaiian', 'Health', 'Heartland',
+    'Helios', 'Henry', 'Herman', 'Hess', 'Hilltop', 'Holly', 'Host', 'Howard', 'HP', 'Hub',
+    'Hudson', 'ICU', 'Illinois', 'Innovative', 'Insight', 'Inspire', 'Integer', 'Intel', 'Inter',
+    'Interactive', 'Intercontinental', 'Intuitive', 'Investors', 'Invitation', 'Iridium', 'Iron',
+    'ITT', 'J', 'Jacobs', 'John', 'Johnson', 'Jones', 'JP', 'Juniper', 'Kansas', 'KB', 'Kinder',
+    'Kirby', 'Kodiak', 'L', 'Laboratory', 'Lam', 'Lamar', 'Lancaster', 'Las', 'Lattice', 'Laureate',
+    'Lear', 'Legend', 'Lemonade', 'Levi', 'Lexington', 'Life', 'Ligand', 'Lumen', 'M&T', 'Madison',
+    'Magna', 'Magnolia', 'Main', 'Manhattan', 'Marsh', 'Martin', 'Matador', 'Match', 'Maxim',
+    'Maximus', 'Medical', 'Merit', 'Microchip', 'Minerals', 'Mohawk', 'Molina', 'Monolithic',
+    'Monster', 'Morgan', 'Mosaic', 'Mr.', 'MSC', 'MUELLER', 'Mueller', 'Myriad', 'Newell', 'NIC',
+    'Norfolk', 'Northern', 'NorthWestern', 'Norwegian', 'NOV', 'Nu', 'O-I', 'Oak', 'Occidental',
+    'Omega', 'ON', 'Onto', 'Option', 'Oracle', 'Ortho', 'Outset', 'Packaging', 'Palo', 'Pan',
+    'Papa', 'Paramount', 'Park', 'Patrick', 'Patterson', 'Penn', "People's", 'Performance',
+    'Philip', 'Physicians', 'Piedmont', 'Pioneer', 'Piper', 'Plains', 'Planet', 'Plexus', 'Plug',
+    'Polaris', 'Pool', 'Popular', 'Portland', 'Post', 'Power', 'PPG', 'PPL', 'Premier', 'Prestige',
+    'Primo', 'Principal', 'PROG', 'Progress', 'Progressive', 'Prospect', 'Prosperity', 'Proto',
+    'Prudential', 'PS', 'Purple', 'Quaker', 'Quest', 'R1', 'Ralph', 'Range', 'Raymond', 'Realty',
+    'Red', 'Regal', 'Regency', 'Regions', 'Reinsurance', 'Relay', 'Reliance', 'Renewable',
+    'Republic', 'Restaurant', 'Retail', 'Revolution', 'Reynolds', 'RH', 'Riot', 'Ritchie', 'Robert',
+    'Rockwell', 'Rollins', 'Root', 'Roper', 'Ross', 'Royalty', 'RPM', 'Ryder', 'S&P', 'Sabre',
+    'Sage', 'Sally', 'Sana', 'Sanderson', 'Sandy', 'Schneider', 'Scientific', 'Sea', 'Sealed',
+    'Seer', 'Select', 'Selective', 'Shake', 'Shaw', 'Shell', 'Shenandoah', 'Signature', 'Silicon',
+    'Simmons', 'Simon', 'Simpson', 'Sinclair', 'Sirius', 'SITE', 'Six', 'Skyline', 'SL', 'Sleep',
+    'SM', 'Snap', 'Snowflake', 'Sonic', 'Southwestern', 'Spectrum', 'Spire', 'Sprout', 'Sprouts',
+    'Square', 'SS&C', 'SSR', 'St.', 'Stag', 'Stanley', 'State', 'Steel', 'Sterling', 'Steven',
+    'Stitch', 'STORE', 'Strategic', 'Summit', 'Surgery', 'T.', 'Tandem', 'Tapestry', 'Target',
+    'Taylor', 'TC', 'Telephone', 'Tenet', 'Tetra', 'TG', 'Thomson', 'Thor', 'Toll', 'Toro',
+    'Toronto', 'Tractor', 'Travel', 'Treehouse', 'Tri', 'Trinity', 'Triumph', 'Turning',
+    'Turquoise', 'Twist', 'Two', 'Tyler', 'Tyson', 'U.S.', 'Ultra', 'Union', 'Unity', 'Upstart',
+    'Urban', 'US', 'Vail', 'Valley', 'Vector', 'Viper', 'Visa', 'Vulcan', 'W.', 'Walker', 'Warner',
+    'Washington', 'Waters', 'Watts', 'Webster', 'Wells', 'Werner', 'West', 'Wheaton', 'Whirlpool',
+    'White', 'Williams', 'Wolverine', 'Woodward', 'WW', 'Yum', 'Yum!', 'Zebra', 'Zoom',
+}
+COMPANY_SUFFIX = re.compile(
+    r'(,?( and| &)? (Inc\.?|Incorporated|Corporation|Corp\.?|Company|Co\.?|Ltd\.?|Limited|plc|PLC'
+    r'|L\.?P\.?|N\.V\.|Holdings?|Group|Trust))+$'
+)
+
+def company_name(key):
+    '''
+    COMPANY NAME OF A tickers.pickle KEY WITHOUT ITS LEGAL SUFFIX: "Best Buy Co. Inc. (BBY)" -> "Best Buy"
+    '''
+    name = COMPANY_SUFFIX.sub('', key.rsplit(' (', 1)[0])
+    return name[4:] if name.startswith('The ') else name
+
+class _Automaton:
+    '''
+    PURE PYTHON AHO-CORASICK WITH THE PART OF pyahocorasick's API THAT Matcher USES
+    '''
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+
+    def add_word(self, word, value):
+        state = 0
+        for ch in word:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            state = nxt
+        self.out[state] = (value,)
+
+    def make_automaton(self):
+        # BREADTH FIRST, SO A STATE'S FAILURE LINK IS FINISHED BEFORE ITS CHILDREN NEED IT
+        goto, fail, out = self.goto, self.fail, self.out
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in goto[state].items():
+                queue.append(child)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                out[child] = out[child] + out[fail[child]]
+
+    def iter(self, haystack):
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for end, ch in enumerate(haystack):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for value in out[state]:
+                yield end, value
+
+def _is_word(ch):
+    return ch.isalnum() or ch == '_'
+
+class Matcher:
+    '''
+    EVERY CASHTAG, BARE SYMBOL AND ALIAS OF A tickers.pickle DICT IN ONE AUTOMATON
+    '''
+
+    def __init__(self, ticker_list, automaton=None):
+        aliases = Counter(alias for symbol, alias in ticker_list.values())
+        names = {key: company_name(key) for key in ticker_list}
+        name_counts = Counter(names.values())
+        needles = {}
+        for key, (symbol, alias) in ticker_list.items():
+            words = ['$' + symbol, '$' + symbol.lower()]
+            if len(symbol) >= BARE_SYMBOL_MIN and symbol not in COMMON_WORDS:
+                words.append(symbol)
+            if aliases[alias] == 1 and alias not in COMMON_ALIASES and alias.upper() not in COMMON_WORDS:
+                if len(alias) >= ALIAS_MIN:
+                    words.append(alias)
+            elif ' ' in names[key] and name_counts[names[key]] == 1:
+                words.append(names[key])
+            for word in words:
+                needles.setdefault(word, set()).add(symbol)
+
+        if automaton is None:
+            automaton = ahocorasick.Automaton() if ahocorasick is not None else _Automaton()
+        for word, symbols in needles.items():
+            # A WORD BOUNDARY IS ONLY NEEDED ON A SIDE THAT ENDS IN A WORD CHARACTER ($DIS, A.O.)
+            automaton.add_word(word, (len(word), _is_word(word[0]), _is_word(word[-1]), tuple(symbols)))
+        automaton.make_automaton()
+        self.automaton = automaton
+
+    def extract(self, body):
+        '''
+        SET OF SYMBOLS MENTIONED IN A COMMENT BODY, IN ONE PASS OVER THE TEXT
+        '''
+        found = set()
+        last = len(body) - 1
+        for end, (length, left, right, symbols) in self.automaton.iter(body):
+            start = end - length + 1
+            if left and start > 0 and _is_word(body[start - 1]):
+                continue
+            if right and end < last and _is_word(body[end + 1]):
+                continue
+            found.update(symbols)
+        return found
+
+def body_hash(body):
+    '''
+    SAME DIGEST AS decode(md5(body), 'hex') IN POSTGRES (migrations/0003)
+    '''
+    return hashlib.md5((body or '').encode('utf-8')).digest()
+
+def buzz_query(granularity, ticker, window=None):
+    '''
+    (SQL, PARAMS) FOR A TICKER'S MENTION COUNTS AT granularity ('minute', 'hour' OR 'day')
+    OVER THE LAST window (A timedelta, DEFAULTS TO BUZZ_WINDOWS)
+    '''
+    if granularity not in ROLLUPS:
+        raise ValueError('unknown rollup %r' % granularity)
+    since = datetime.now() - (window or BUZZ_WINDOWS[granularity])
+    return BUZZ_QUERY % granularity, {'ticker': ticker, 'since': since}
+
+def prune_rollups(engine):
+    '''
+    DROP ROLLUP BUCKETS OLDER THAN THEIR RETENTION
+    '''
+    for granularity, retention in ROLLUPS.items():
+        engine.execute(
+            "DELETE FROM mention_counts_%s WHERE bucket < %%(cutoff)s" % granularity,
+            {'cutoff': datetime.now() - retention},
+        )
+
+def _insert_mentions(conn, comment_id, ts, symbols):
+    if symbols:
+        rows = [{'comment_id': comment_id, 'ticker': symbol, 'ts': ts} for symbol in symbols]
+        conn.execute(UPSERT_MENTION, rows)
+        for upsert in UPSERT_ROLLUPS:
+            conn.execute(upsert, rows)
+
+def ingest(engine, date_time, subreddit, title, body, matcher):
+    '''
+    STORE A COMMENT AND ITS MENTIONS IN ONE TRANSACTION. A BODY THAT IS ALREADY STORED IS
+    NOT DUPLICATED, ITS ROW AND MENTIONS ARE MOVED TO date_time. RETURNS THE ROW'S id.
+    '''
+    with engine.begin() as conn:
+        comment_id = conn.execute(UPSERT_COMMENT, {
+            'date_time': date_time, 'subreddit': subreddit, 'title': title, 'body': body,
+            'body_hash': body_hash(body),
+        }).scalar()
+        _insert_mentions(conn, comment_id, date_time, matcher.extract(body))
+    return comment_id
+
+def backfill(engine, matcher):
+    '''
+    EXTRACT MENTIONS FOR COMMENTS STORED AFTER THE LAST ONE THAT HAS ANY (E.G. ROWS FROM
+    BEFORE THE MENTIONS TABLE EXISTED). RETURNS THE NUMBER OF COMMENTS SCANNED.
+    '''
+    last_id = engine.execute("SELECT COALESCE(MAX(comment_id), 0) FROM mentions").scalar()
+    scanned = 0
+    while True:
+        rows = engine.execute(
+            text("SELECT id, date_time, body FROM reddit_data WHERE id > :last_id ORDER BY id LIMIT :batch"),
+            {'last_id': last_id, 'batch': BACKFILL_BATCH},
+        ).fetchall()
+        if not rows:
+            return scanned
+        with engine.begin() as conn:
+            for comment_id, date_time, body in rows:
+                if date_time is not None:
+                    _insert_mentions(conn, comment_id, date_time, matcher.extract(body or ''))
+        last_id = rows[-1][0]
+        scanned += len(rows)
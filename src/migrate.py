@@ -0,0 +1,84 @@
+"""
+Schema migrations for the comment database. Each file in migrations/ is one
+migration, applied once in file name order and recorded in schema_migrations.
+A migration runs in a transaction unless its first line starts with
+"-- no-transaction" (needed for CREATE INDEX CONCURRENTLY), in which case its
+statements run one by one and must be safe to re-run.
+
+    python -m src.migrate           apply pending migrations (the Procfile release phase)
+    python -m src.migrate --list    show applied and pending migrations
+"""
+import os
+import sys
+from sqlalchemy import create_engine, text
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# ANY CONSTANT, KEEPS TWO DEPLOYS FROM MIGRATING AT THE SAME TIME
+LOCK_ID = 7318
+
+def migrations():
+    '''
+    [(VERSION, PATH)] FOR EVERY MIGRATION FILE, IN THE ORDER THEY ARE APPLIED
+    '''
+    names = sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith('.sql'))
+    return [(name[:-len('.sql')], os.path.join(MIGRATIONS_DIR, name)) for name in names]
+
+def _statements(sql):
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+def applied(engine):
+    engine.execute("""CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(200) PRIMARY KEY,
+        applied_at TIMESTAMP NOT NULL DEFAULT now()
+    )""")
+    return {version for version, in engine.execute("SELECT version FROM schema_migrations")}
+
+def _apply(engine, version, path):
+    with open(path) as f:
+        sql = f.read()
+    record = text("INSERT INTO schema_migrations (version) VALUES (:version)")
+
+    if sql.startswith('-- no-transaction'):
+        with engine.connect() as conn:
+            conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+            for statement in _statements(sql):
+                conn.execute(statement)
+            conn.execute(record, version=version)
+        return
+
+    with engine.begin() as conn:
+        for statement in _statements(sql):
+            conn.execute(statement)
+        conn.execute(record, version=version)
+
+def upgrade(engine):
+    '''
+    APPLY EVERY PENDING MIGRATION, RETURNS THE VERSIONS APPLIED
+    '''
+    with engine.connect() as lock:
+        lock.execute(text("SELECT pg_advisory_lock(:id)"), id=LOCK_ID)
+        try:
+            done = applied(engine)
+            pending = [(version, path) for version, path in migrations() if version not in done]
+            for version, path in pending:
+                print('applying migration %s' % version)
+                _apply(engine, version, path)
+            return [version for version, _ in pending]
+        finally:
+            lock.execute(text("SELECT pg_advisory_unlock(:id)"), id=LOCK_ID)
+
+def main(argv):
+    from dotenv import load_dotenv
+    load_dotenv()
+    engine = create_engine(os.getenv("DATABASE_URL"))
+    if '--list' in argv:
+        done = applied(engine)
+        for version, _ in migrations():
+            print('%-8s %s' % ('applied' if version in done else 'pending', version))
+        return
+    upgrade(engine)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
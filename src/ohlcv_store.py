@@ -0,0 +1,150 @@
+"""
+Daily bars are kept on disk per ticker as one .npy file per column, so a warm
+read loads a few local arrays instead of making a Yahoo download. The columns
+are memory-mapped, but the DataFrame built from them holds its own copy, so a
+read is cheap without being zero-copy.
+
+Every write goes into a fresh generation directory and the CURRENT file is
+swapped atomically afterwards, which means readers (including other gunicorn
+workers) never see a half-written frame:
+
+    data/ohlcv/DIS/CURRENT       -> "1623445000123"
+    data/ohlcv/DIS/1623445000123/ meta.json, date.npy, open.npy, close.npy, ...
+"""
+import os
+import json
+import time
+import fcntl
+import shutil
+import yfinance
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+
+STORE_DIR = os.getenv('OHLCV_STORE_DIR', os.path.join('data', 'ohlcv'))
+
+PERIOD_YEARS = {'1y': 1, '2y': 2, '5y': 5, '10y': 10}
+
+def _ticker_dir(ticker):
+    return os.path.join(STORE_DIR, ticker.upper())
+
+def _file_name(column):
+    return column.lower().replace(' ', '_') + '.npy'
+
+@contextmanager
+def _write_lock(ticker):
+    # ONE WRITER PER TICKER ACROSS PROCESSES, READERS NEVER TAKE IT
+    os.makedirs(_ticker_dir(ticker), exist_ok=True)
+    with open(os.path.join(_ticker_dir(ticker), '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _read_generation(gen_dir):
+    with open(os.path.join(gen_dir, 'meta.json')) as f:
+        meta = json.load(f)
+    dates = np.load(os.path.join(gen_dir, 'date.npy'), mmap_mode='r')
+    index = pd.DatetimeIndex(dates.view('datetime64[ns]'), name='Date')
+    columns = {
+        column: np.load(os.path.join(gen_dir, _file_name(column)), mmap_mode='r')
+        for column in meta['columns']
+    }
+    return pd.DataFrame(columns, index=index, columns=meta['columns']), meta
+
+def read(ticker, with_meta=False):
+    '''
+    LOAD THE STORED BARS FOR A TICKER (COPIED OUT OF THE MEMORY-MAPPED COLUMNS), None IF NOTHING IS STORED
+    '''
+    df, meta = None, None
+    for _ in range(3):
+        try:
+            with open(os.path.join(_ticker_dir(ticker), 'CURRENT')) as f:
+                gen_dir = os.path.join(_ticker_dir(ticker), f.read().strip())
+            df, meta = _read_generation(gen_dir)
+            break
+        except FileNotFoundError:
+            # NOTHING STORED YET, OR A WRITER REMOVED THE GENERATION WE WERE ABOUT TO OPEN
+            continue
+    return (df, meta) if with_meta else df
+
+def write(ticker, df, period):
+    '''
+    WRITE A FULL FRAME AS A NEW GENERATION AND MAKE IT CURRENT
+    '''
+    ticker_dir = _ticker_dir(ticker)
+    generation = str(int(time.time() * 1000))
+    gen_dir = os.path.join(ticker_dir, generation)
+    os.makedirs(gen_dir)
+
+    np.save(os.path.join(gen_dir, 'date.npy'), df.index.values.astype('datetime64[ns]').view('int64'))
+    for column in df.columns:
+        np.save(os.path.join(gen_dir, _file_name(column)), df[column].values)
+    with open(os.path.join(gen_dir, 'meta.json'), 'w') as f:
+        json.dump({'columns': list(df.columns), 'rows': int(df.shape[0]), 'period': period}, f)
+
+    tmp = os.path.join(ticker_dir, 'CURRENT.tmp')
+    with open(tmp, 'w') as f:
+        f.write(generation)
+    os.replace(tmp, os.path.join(ticker_dir, 'CURRENT'))
+
+    # OLD GENERATIONS CAN GO, OPEN MMAPS IN OTHER PROCESSES STAY VALID AFTER UNLINK
+    for name in os.listdir(ticker_dir):
+        path = os.path.join(ticker_dir, name)
+        if name != generation and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+def _years(period):
+    return PERIOD_YEARS.get(period, 0)
+
+def _needs_full_download(delta, stored_last):
+    # A NEW DIVIDEND OR SPLIT RE-ADJUSTS THE WHOLE HISTORY, SO THE STORED BARS ARE NO LONGER VALID
+    new_rows = delta[delta.index > stored_last]
+    for column in ('Dividends', 'Stock Splits'):
+        if column in new_rows.columns and (new_rows[column] != 0).any():
+            return True
+    return False
+
+def refresh(ticker, period='5y'):
+    '''
+    BRING THE STORED BARS UP TO DATE, DOWNLOADING ONLY THE BARS SINCE THE LAST STORED DATE
+    '''
+    with _write_lock(ticker):
+        stored, meta = read(ticker, with_meta=True)
+        stock = yfinance.Ticker(ticker)
+
+        if stored is None or stored.shape[0] == 0 or _years(meta['period']) < _years(period):
+            df = stock.history(period=period)
+        else:
+            # THE LAST STORED BAR MAY HAVE BEEN A PARTIAL SESSION, SO IT IS RE-DOWNLOADED TOO
+            stored_last = stored.index[-1]
+            delta = stock.history(start=stored_last.strftime('%Y-%m-%d'))
+            if delta.shape[0] == 0:
+                return stored
+            if _years(meta['period']) > _years(period):
+                period = meta['period']
+            if _needs_full_download(delta, stored_last):
+                df = stock.history(period=period)
+            else:
+                df = pd.concat([stored[stored.index < delta.index[0]], delta[stored.columns]])
+
+        if df.shape[0] > 0:
+            write(ticker, df, period)
+        return df
+
+def trim(df, period):
+    '''
+    THE BARS OF df THAT FALL IN A yfinance-STYLE PERIOD ('1y', '5y', ...) ENDING TODAY
+    '''
+    years = _years(period)
+    if not years or df.shape[0] == 0:
+        return df
+    start = pd.Timestamp.now().normalize() - pd.DateOffset(years=years)
+    return df[df.index >= start]
+
+def load(ticker, period='5y'):
+    '''
+    REFRESHED BARS FOR A TICKER TRIMMED TO A yfinance-STYLE PERIOD ('1y', '5y', ...)
+    '''
+    return trim(refresh(ticker, period), period)
@@ -0,0 +1,146 @@
+"""
+Cache backends shared by every gunicorn worker on a host, so history and info
+are downloaded once per host instead of once per worker. Pick one with
+SHARED_CACHE_URL:
+
+    file:///dev/shm/ticker-buzz   pickled entries in a (RAM backed) directory, the default
+    redis://localhost:6379/0      any Redis-compatible server, needs the optional redis package
+    none                          keep every worker on its own in-process cache
+"""
+import os
+import time
+import fcntl
+import pickle
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+DEFAULT_DIR = '/dev/shm/ticker-buzz' if os.path.isdir('/dev/shm') else os.path.join(tempfile.gettempdir(), 'ticker-buzz')
+
+# HOW LONG A WORKER WAITS FOR ANOTHER WORKER'S DOWNLOAD BEFORE DOING ITS OWN
+LOCK_TIMEOUT = int(os.getenv('SHARED_CACHE_LOCK_TIMEOUT', 60))
+
+class FileBackend:
+    '''
+    ONE PICKLE FILE PER KEY. THE FILE MTIME IS THE EXPIRY TIME, SO SWEEPS NEVER OPEN FILES.
+    '''
+
+    SWEEP_EVERY = 200
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, 'locks'), exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    def _path(self, key, kind='data'):
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        if kind == 'lock':
+            return os.path.join(self.directory, 'locks', name)
+        return os.path.join(self.directory, name)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if os.stat(path).st_mtime < time.time():
+                raise FileNotFoundError(path)
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key, value, ttl):
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        expires = time.time() + ttl
+        os.utime(tmp, (expires, expires))
+        os.replace(tmp, path)
+
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            self.sweep()
+
+    @contextmanager
+    def lock(self, key):
+        with open(self._path(key, 'lock'), 'w') as f:
+            deadline = time.time() + LOCK_TIMEOUT
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.time() > deadline:
+                        # GIVE UP WAITING, THE CALLER FETCHES ON ITS OWN
+                        yield
+                        return
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def sweep(self):
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < now:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        return {'backend': 'file', 'hits': self.hits, 'misses': self.misses}
+
+class RedisBackend:
+    '''
+    PICKLED VALUES IN A REDIS-COMPATIBLE SERVER WITH NATIVE EXPIRY AND redis-py LOCKS
+    '''
+
+    def __init__(self, url):
+        import redis # OPTIONAL DEPENDENCY, ONLY NEEDED FOR redis:// URLS
+        self.client = redis.Redis.from_url(url)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        data = self.client.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(data)
+
+    def set(self, key, value, ttl):
+        self.client.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=int(ttl))
+
+    @contextmanager
+    def lock(self, key):
+        lock = self.client.lock('lock:' + key, timeout=LOCK_TIMEOUT, blocking_timeout=LOCK_TIMEOUT)
+        acquired = lock.acquire()
+        try:
+            yield
+        finally:
+            if acquired:
+                lock.release()
+
+    def stats(self):
+        return {'backend': 'redis', 'hits': self.hits, 'misses': self.misses}
+
+def get_backend(url=None):
+    '''
+    BUILD THE SHARED BACKEND FROM SHARED_CACHE_URL, None MEANS IN-PROCESS CACHING ONLY
+    '''
+    url = url or os.getenv('SHARED_CACHE_URL', 'file://' + DEFAULT_DIR)
+    if url == 'none':
+        return None
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBackend(url)
+    if url.startswith('file://'):
+        return FileBackend(url[len('file://'):])
+    raise ValueError('Unsupported SHARED_CACHE_URL: ' + url)
@@ -0,0 +1,141 @@
+"""
+Background warm-up so user requests land on warm data. One worker per host
+(whichever grabs the leader lock first) refreshes the history and info of the
+configured hot list plus the most requested tickers on a timer, through the
+shared cache. The indicator memos are per process, so every worker then
+computes the hot tickers' indicators from that shared history itself. Every
+worker records its own traffic and flushes the counts to a shared directory so
+the leader sees the whole host.
+"""
+import os
+import json
+import time
+import fcntl
+import threading
+import tempfile
+from collections import Counter
+from src.market_data import FIRST_PAINT_HISTORY, FULL_PERIOD, fetch_history, first_paint_history, fetch_info
+from src.indicators import CHART_SERIES, chart_series
+
+# REFRESH A LITTLE MORE OFTEN THAN HISTORY_CACHE_TTL SO HOT ENTRIES NEVER EXPIRE
+WARMUP_INTERVAL = int(os.getenv('WARMUP_INTERVAL', 240))
+WARMUP_TICKERS = [t.strip() for t in os.getenv('WARMUP_TICKERS', 'DIS').split(',') if t.strip()]
+WARMUP_TOP_N = int(os.getenv('WARMUP_TOP_N', 20))
+WARMUP_DIR = os.getenv('WARMUP_DIR', os.path.join(tempfile.gettempdir(), 'ticker-buzz-warmup'))
+
+_traffic = Counter()
+_traffic_lock = threading.Lock()
+_warmers = []
+
+def record_request(ticker):
+    '''
+    COUNT A USER REQUEST FOR A TICKER (CHEAP, CALLED FROM THE CALLBACKS)
+    '''
+    with _traffic_lock:
+        _traffic[ticker] += 1
+
+def _flush_traffic():
+    os.makedirs(os.path.join(WARMUP_DIR, 'traffic'), exist_ok=True)
+    with _traffic_lock:
+        counts = dict(_traffic)
+    path = os.path.join(WARMUP_DIR, 'traffic', '%d.json' % os.getpid())
+    with open(path + '.tmp', 'w') as f:
+        json.dump(counts, f)
+    os.replace(path + '.tmp', path)
+
+def top_tickers(n):
+    '''
+    MOST REQUESTED TICKERS ACROSS ALL WORKERS THAT FLUSHED RECENTLY
+    '''
+    totals = Counter()
+    traffic_dir = os.path.join(WARMUP_DIR, 'traffic')
+    if not os.path.isdir(traffic_dir):
+        return []
+    cutoff = time.time() - 3 * WARMUP_INTERVAL
+    for entry in os.scandir(traffic_dir):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path) # WORKER IS GONE
+                continue
+            with open(entry.path) as f:
+                totals.update(json.load(f))
+        except (FileNotFoundError, ValueError):
+            continue
+    return [ticker for ticker, _ in totals.most_common(n)]
+
+def warm_list():
+    tickers = list(WARMUP_TICKERS)
+    for ticker in top_tickers(WARMUP_TOP_N):
+        if ticker not in tickers:
+            tickers.append(ticker)
+    return tickers
+
+def warm(ticker):
+    '''
+    RELOAD HISTORY AHEAD OF EXPIRY AND MAKE SURE INFO IS CACHED (LEADER ONLY, THE SHARED CACHE
+    HANDS THE RESULT TO EVERY WORKER)
+    '''
+    # FULL HISTORY FIRST, THE FIRST-PAINT RELOAD THEN ONLY DOWNLOADS BARS NEWER THAN THE STORED ONES
+    fetch_history(ticker, period=FULL_PERIOD, refresh=True)
+    fetch_history(ticker, period=FIRST_PAINT_HISTORY, refresh=True)
+    fetch_info(ticker)
+
+def warm_indicators(ticker):
+    '''
+    PRECOMPUTE EVERY INDICATOR CHART IN THIS WORKER'S chart_series MEMO, FOR THE FULL HISTORY AND
+    THE FIRST PAINT. RUN BY EVERY WORKER, THE HISTORY COMES FROM THE CACHE THE LEADER KEEPS WARM
+    '''
+    history, _ = fetch_history(ticker, period=FULL_PERIOD)
+    _, seed, _ = first_paint_history(ticker)
+    for frame in (history, seed):
+        for chart_name in CHART_SERIES:
+            chart_series(ticker, frame, chart_name)
+
+def _acquire_leader():
+    os.makedirs(WARMUP_DIR, exist_ok=True)
+    lock = open(os.path.join(WARMUP_DIR, 'leader.lock'), 'w')
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None
+    return lock # KEEP THE FILE OPEN, THE LOCK IS RELEASED WHEN THIS PROCESS EXITS
+
+def _log_error(message):
+    # SAME errors.txt AS THE DASHBOARD'S CALLBACKS
+    with open('errors.txt', 'a') as f:
+        f.write(message)
+        f.write('\n')
+
+def _run():
+    leader = None
+    while True:
+        try:
+            _flush_traffic()
+            if leader is None:
+                leader = _acquire_leader()
+            tickers = warm_list()
+            if leader is not None:
+                for ticker in tickers:
+                    try:
+                        warm(ticker)
+                    except Exception as e:
+                        _log_error('warm-up failed for %s: %s' % (ticker, e))
+            for ticker in tickers:
+                try:
+                    warm_indicators(ticker)
+                except Exception as e:
+                    _log_error('indicator warm-up failed for %s: %s' % (ticker, e))
+        except Exception as e:
+            _log_error('warm-up error: %s' % e)
+        time.sleep(WARMUP_INTERVAL)
+
+def start():
+    '''
+    START THE WARM-UP THREAD ONCE PER PROCESS (WARMUP_INTERVAL=0 DISABLES IT)
+    '''
+    if WARMUP_INTERVAL <= 0 or _warmers:
+        return
+    thread = threading.Thread(target=_run, name='ticker-warmup', daemon=True)
+    thread.start()
+    _warmers.append(thread)
@@ -0,0 +1,40 @@
+"""
+Point counts of the chart downsampling in src/downsample.py.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import downsample, indicators
+
+def _history(n, seed=0):
+    close = 100.0 + np.cumsum(np.random.default_rng(seed).normal(0.0, 1.0, n))
+    df = pd.DataFrame({'Open': close, 'High': close + 1.0, 'Low': close - 1.0, 'Close': close},
+                      index=pd.bdate_range('2005-01-03', periods=n))
+    series = {}
+    for chart_name in indicators.CHART_SERIES:
+        series.update(indicators.for_chart(close, chart_name))
+    return df, series
+
+@pytest.mark.parametrize('bars, width', [(1260, 800), (1260, 600), (5000, 800)])
+def test_reduce_all_keeps_about_width_points(bars, width):
+    df, series = _history(bars)
+    line_df, line_series, candles = downsample.reduce_all(df, series, width=width)
+    assert line_df.shape[0] == width
+    assert all(len(values) == width for values in line_series.values())
+    assert candles.shape[0] <= width // downsample.PIXELS_PER_BAR
+    # THE FIRST AND LAST BARS ARE ALWAYS KEPT
+    assert line_df.index[0] == df.index[0] and line_df.index[-1] == df.index[-1]
+
+def test_reduce_all_zoom_is_detailed_inside_the_window():
+    df, series = _history(5000)
+    window = (df.index[2000], df.index[2199])
+    line_df, _, _ = downsample.reduce_all(df, series, x_range=window, width=800)
+    inside = (line_df.index >= window[0]) & (line_df.index <= window[1])
+    assert inside.sum() == 200
+    assert line_df.shape[0] <= 2 * 800
+
+def test_short_history_is_not_reduced():
+    df, series = _history(500)
+    line_df, line_series, candles = downsample.reduce_all(df, series, width=800)
+    assert line_df is df and line_series is series
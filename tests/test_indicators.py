@@ -0,0 +1,115 @@
+"""
+The vectorized indicators in src/indicators.py against stockstats, which the
+charts used before, and the incremental IndicatorState against a full recompute.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import indicators
+
+def _history(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+    dates = pd.date_range('2020-01-01', periods=n, freq='B')
+    return dates, close
+
+def _assert_same(ours, expected):
+    # stockstats FILLS THE WARM-UP BARS (min_periods=1), WE LEAVE THEM NaN
+    ours, expected = np.asarray(ours, dtype='float64'), np.asarray(expected, dtype='float64')
+    both = ~np.isnan(ours) & ~np.isnan(expected)
+    assert both.sum() > 0
+    np.testing.assert_allclose(ours[both], expected[both], rtol=1e-9, atol=1e-9)
+
+@pytest.fixture(scope='module')
+def stock_frame():
+    stockstats = pytest.importorskip('stockstats')
+    dates, close = _history()
+    df = pd.DataFrame({'open': close, 'high': close + 1.0, 'low': close - 1.0,
+                       'close': close, 'volume': 1000.0}, index=dates)
+    return close, stockstats.StockDataFrame.retype(df)
+
+@pytest.mark.parametrize('window', indicators.SMA_WINDOWS)
+def test_sma_matches_stockstats(stock_frame, window):
+    close, frame = stock_frame
+    ours = indicators.sma(close, window)
+    assert np.isnan(ours[:window - 1]).all()
+    _assert_same(ours, frame['close_%d_sma' % window])
+
+@pytest.mark.parametrize('span', indicators.EMA_SPANS)
+def test_ema_matches_stockstats(stock_frame, span):
+    close, frame = stock_frame
+    _assert_same(indicators.ema(close, span), frame['close_%d_ema' % span])
+
+def test_macd_matches_stockstats(stock_frame):
+    close, frame = stock_frame
+    for ours, name in zip(indicators.macd(close), ('macd', 'macds', 'macdh')):
+        _assert_same(ours, frame[name])
+
+@pytest.mark.parametrize('window', indicators.RSI_WINDOWS)
+def test_rsi_matches_stockstats(stock_frame, window):
+    close, frame = stock_frame
+    _assert_same(indicators.rsi(close, window), frame['rsi_%d' % window])
+
+@pytest.mark.parametrize('chart_name', sorted(indicators.CHART_SERIES))
+def test_for_chart_matches_stockstats(stock_frame, chart_name):
+    close, frame = stock_frame
+    series = indicators.for_chart(close, chart_name)
+    assert sorted(series) == sorted(indicators.CHART_SERIES[chart_name])
+    for name, values in series.items():
+        _assert_same(values, frame[name])
+
+def test_ewm_mean_matches_pandas():
+    _, close = _history()
+    close[[5, 50, 51]] = np.nan
+    expected = pd.Series(close).ewm(alpha=0.1, adjust=True, ignore_na=False, min_periods=0).mean()
+    np.testing.assert_allclose(indicators.ewm_mean(close, 0.1), expected.values, rtol=1e-12)
+
+
+#------------------------INCREMENTAL PER-TICKER STATE--------------------------#
+
+def _recompute(close):
+    series = {'close': np.asarray(close, dtype='float64')}
+    for chart_name in indicators.CHART_SERIES:
+        series.update(indicators.for_chart(close, chart_name))
+    return series
+
+def _assert_matches_recompute(state, close):
+    for name, values in _recompute(close).items():
+        np.testing.assert_allclose(state.series[name].view(), values, rtol=1e-10, atol=1e-10, err_msg=name)
+
+def test_state_append_matches_recompute():
+    dates, close = _history()
+    state = indicators.IndicatorState(dates[:300], close[:300])
+    for i in range(300, len(dates)):
+        state.append(dates[i], close[i])
+    assert state.size == len(dates)
+    assert state.last_date == dates[-1]
+    _assert_matches_recompute(state, close)
+
+def test_state_replace_last_matches_recompute():
+    dates, close = _history()
+    state = indicators.IndicatorState(dates[:-1], close[:-1])
+    state.append(dates[-1], close[-1])
+    revised = close.copy()
+    for value in (close[-1] + 2.5, close[-1] - 4.0):
+        state.replace_last(value)
+        revised[-1] = value
+        _assert_matches_recompute(state, revised)
+
+def test_state_sync_folds_new_and_revised_bars():
+    dates, close = _history()
+    state = indicators.IndicatorState(dates[:-10], close[:-10])
+    state.append(dates[-10], close[-10])
+
+    revised = close.copy()
+    revised[-10] += 1.0
+    offset = state.sync(dates[100:], revised[100:])
+    assert offset == 100
+    _assert_matches_recompute(state, revised)
+
+def test_state_sync_rejects_readjusted_history():
+    dates, close = _history()
+    state = indicators.IndicatorState(dates[:-5], close[:-5])
+    adjusted = close * 0.5
+    assert state.sync(dates, adjusted) is None
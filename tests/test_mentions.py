@@ -0,0 +1,70 @@
+"""
+Ticker extraction (src/mentions.py Matcher) on real tickers.pickle symbols,
+with both the pure Python and the pyahocorasick automaton.
+"""
+import os
+import pickle
+import pytest
+
+pytest.importorskip('sqlalchemy')
+from src import mentions
+
+TICKERS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tickers.pickle')
+
+@pytest.fixture(scope='module')
+def ticker_list():
+    with open(TICKERS, 'rb') as f:
+        return pickle.load(f)
+
+@pytest.fixture(scope='module', params=['python', 'pyahocorasick'])
+def matcher(request, ticker_list):
+    if request.param == 'python':
+        return mentions.Matcher(ticker_list, automaton=mentions._Automaton())
+    if mentions.ahocorasick is None:
+        pytest.skip('pyahocorasick is not installed')
+    return mentions.Matcher(ticker_list)
+
+@pytest.mark.parametrize('body, expected', [
+    ('EDIT: sold my $DIS calls', {'DIS'}),
+    ('TSLA to the moon', {'TSLA'}),
+    ('Disney+ numbers beat, holding $dis', {'DIS'}),
+    ('$LOW and $open both green', {'LOW', 'OPEN'}),
+    ('mentioned AMD, not AMDX or XAMD', {'AMD'}),
+    ('Best Buy and General Electric both beat', {'BBY', 'GE'}),
+])
+def test_extract(matcher, body, expected):
+    assert matcher.extract(body) == expected
+
+@pytest.mark.parametrize('body', [
+    'Bought the dip at the LOW of the day',
+    'The market is OPEN tomorrow',
+    'KEY takeaway: buy high, sell low',
+    'REAL talk, this is not financial advice',
+    'SAFE to say we are going down',
+    'TWO more weeks',
+    'WELL that aged badly',
+    'POST earnings drop was brutal',
+    'NET loss for the quarter',
+    'my CAT walked over the keyboard',
+    'sold my CAR for margin',
+    'TLDR: IMO YOLO FOMO, WEN moon',
+    'First time buyer',
+    'The American economy is fine',
+    'United we stand',
+    'Bank holiday',
+    'General thoughts',
+    'Apple pie',
+    'Best advice I ever got',
+    'Change is coming',
+    'Clean sweep for the bulls',
+    'Target hit, taking profits',
+])
+def test_common_words_are_not_mentions(matcher, body):
+    assert matcher.extract(body) == set()
+
+def test_symbols_that_are_common_words_only_match_as_cashtags(matcher, ticker_list):
+    symbols = {symbol for symbol, alias in ticker_list.values() if symbol in mentions.COMMON_WORDS}
+    assert {'LOW', 'OPEN', 'KEY', 'REAL', 'SAFE', 'TWO', 'WELL', 'POST', 'NET', 'CAT', 'CAR', 'EDIT'} <= symbols
+    for symbol in symbols:
+        assert symbol not in matcher.extract('so %s it is' % symbol)
+        assert symbol in matcher.extract('so $%s it is' % symbol)